@@ -0,0 +1,244 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from models import SessionStatus
+
+# Lookback windows, in days, accepted by the overview endpoints
+OVERVIEW_WINDOWS = (7, 28, 90)
+
+
+def overview_pipeline(match: dict, since: datetime) -> List[dict]:
+    """Aggregation that reduces done sessions since a date to one row per athlete and session type.
+    
+    Sessions without an intensity count as 0, as they always have in the overview.
+    """
+    return [
+        {"$match": {**match, "start": {"$gte": since}, "status": SessionStatus.DONE.value}},
+        {"$group": {
+            "_id": {"athlete_id": "$athlete_id", "type": "$type"},
+            "count": {"$sum": 1},
+            "intensity_sum": {"$sum": {"$ifNull": ["$intensity", 0]}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "athlete_id": "$_id.athlete_id",
+            "type": "$_id.type",
+            "count": 1,
+            "intensity_sum": 1
+        }}
+    ]
+
+
+def summarize_overview(rows: List[dict]) -> Dict[str, object]:
+    """Turn one athlete's per-type rows from overview_pipeline into AthleteOverview fields."""
+    volume = sum(row['count'] for row in rows)
+    intensity_sum = sum(row['intensity_sum'] for row in rows)
+    return {
+        "weekly_volume": volume,
+        "intensity_avg": round(intensity_sum / volume, 1) if volume else 0,
+        "sessions_count_by_type": {(row['type'] or 'other'): row['count'] for row in rows}
+    }
+
+
+def summarize_roster_overview(rows: List[dict], athlete_ids: List[str]) -> Dict[str, Dict[str, object]]:
+    """AthleteOverview fields for every athlete, including those without any sessions."""
+    rows_by_athlete: Dict[str, List[dict]] = {athlete_id: [] for athlete_id in athlete_ids}
+    for row in rows:
+        rows_by_athlete.setdefault(row['athlete_id'], []).append(row)
+    return {athlete_id: summarize_overview(rows_by_athlete[athlete_id]) for athlete_id in athlete_ids}
+
+
+# Metric columns of a physical assessment, in AssessmentSeries order
+ASSESSMENT_METRICS = (
+    "strength_max",
+    "strength_endurance",
+    "strength_explosive",
+    "speed_linear",
+    "agility",
+    "power",
+    "mobility",
+    "endurance_aerobic",
+    "endurance_lactate",
+    "icm",
+)
+
+# Optional per-metric statistics for assessment series
+ASSESSMENT_STATS = ("rolling_mean", "delta", "slope")
+
+
+def assessment_matrix(assessments: List[dict]) -> Tuple[List[datetime], np.ndarray]:
+    """Assessment dates and an (assessments x metrics) float matrix with NaN for missing values."""
+    dates = [assessment['date'] for assessment in assessments]
+    matrix = np.array(
+        [[assessment.get(metric) for metric in ASSESSMENT_METRICS] for assessment in assessments],
+        dtype=float
+    ).reshape(len(assessments), len(ASSESSMENT_METRICS))
+    return dates, matrix
+
+
+def rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over the last `window` assessments of each metric, ignoring missing values."""
+    present = ~np.isnan(matrix)
+    sums = np.cumsum(np.where(present, matrix, 0.0), axis=0)
+    counts = np.cumsum(present, axis=0)
+    
+    # Subtract the running totals from `window` rows earlier
+    sums[window:] -= sums[:-window].copy()
+    counts[window:] -= counts[:-window].copy()
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def deltas(matrix: np.ndarray) -> np.ndarray:
+    """Change of each metric since the previous assessment; NaN for the first one."""
+    result = np.full(matrix.shape, np.nan)
+    result[1:] = matrix[1:] - matrix[:-1]
+    return result
+
+
+def slopes(dates: List[datetime], matrix: np.ndarray) -> np.ndarray:
+    """Least-squares trend of each metric, in points per 30 days, ignoring missing values."""
+    if not dates:
+        return np.full(matrix.shape[1], np.nan)
+    
+    days = np.array([(date - dates[0]).total_seconds() / 86400 for date in dates])[:, None]
+    present = ~np.isnan(matrix)
+    counts = present.sum(axis=0)
+    
+    x = np.where(present, days, 0.0)
+    y = np.where(present, matrix, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x_mean = x.sum(axis=0) / counts
+        y_mean = y.sum(axis=0) / counts
+        covariance = (np.where(present, (days - x_mean) * (matrix - y_mean), 0.0)).sum(axis=0)
+        variance = (np.where(present, (days - x_mean) ** 2, 0.0)).sum(axis=0)
+        slope = covariance / variance * 30
+    
+    # A trend needs at least two assessments on different days
+    return np.where((counts >= 2) & (variance > 0), slope, np.nan)
+
+
+def to_optional_list(column: np.ndarray, cast=float) -> List[Optional[float]]:
+    """Convert a NumPy column to JSON-friendly values, with None for NaN."""
+    return [None if np.isnan(value) else cast(value) for value in column.tolist()]
+
+
+# Rolling windows, in days, of the training-load model
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+
+def daily_load_pipeline(match: dict, since: datetime) -> List[dict]:
+    """Aggregation that reduces done sessions to one session-RPE load row per athlete and day.
+    
+    Load is RPE x minutes; sessions without a logged duration use their scheduled length.
+    """
+    minutes = {"$ifNull": ["$duration_min", {"$divide": [{"$subtract": ["$end", "$start"]}, 60000]}]}
+    return [
+        {"$match": {
+            **match,
+            "start": {"$gte": since},
+            "status": SessionStatus.DONE.value,
+            "rpe": {"$ne": None}
+        }},
+        {"$group": {
+            "_id": {
+                "athlete_id": "$athlete_id",
+                "day": {"$dateToString": {"format": "%Y-%m-%d", "date": "$start"}}
+            },
+            "load": {"$sum": {"$multiply": ["$rpe", minutes]}}
+        }},
+        {"$project": {"_id": 0, "athlete_id": "$_id.athlete_id", "day": "$_id.day", "load": 1}}
+    ]
+
+
+def load_window(days: int, today: Optional[datetime] = None) -> Tuple[datetime, int]:
+    """First day to load and the number of days, including the warm-up the chronic window needs.
+    
+    Days are UTC days, matching the $dateToString buckets of daily_load_pipeline.
+    """
+    today = today or datetime.utcnow()
+    total_days = days + CHRONIC_DAYS - 1
+    first_day = datetime(today.year, today.month, today.day) - timedelta(days=total_days - 1)
+    return first_day, total_days
+
+
+def load_matrix(rows: List[dict], athlete_ids: List[str], first_day: datetime, total_days: int) -> np.ndarray:
+    """Scatter (athlete, day, load) rows into an (athletes x days) matrix of daily load."""
+    matrix = np.zeros((len(athlete_ids), total_days))
+    index = {athlete_id: i for i, athlete_id in enumerate(athlete_ids)}
+    rows = [row for row in rows if row['athlete_id'] in index]
+    if not rows:
+        return matrix
+    
+    first = first_day.toordinal()
+    athletes = np.array([index[row['athlete_id']] for row in rows])
+    days = np.array([datetime.strptime(row['day'], "%Y-%m-%d").toordinal() - first for row in rows])
+    loads = np.array([row['load'] or 0 for row in rows], dtype=float)
+    
+    inside = (days >= 0) & (days < total_days)
+    np.add.at(matrix, (athletes[inside], days[inside]), loads[inside])
+    return matrix
+
+
+def _rolling_sum(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Trailing sum over `window` days along the day axis; early days use what is available."""
+    sums = np.cumsum(matrix, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    return sums
+
+
+def load_metrics(matrix: np.ndarray) -> Dict[str, np.ndarray]:
+    """Acute/chronic load, ACWR, Foster monotony and strain for every athlete and day.
+    
+    All outputs have the shape of the input (athletes x days):
+    - acute/chronic: mean daily load over the last 7 / 28 days
+    - acwr: acute / chronic, NaN when there is no chronic load
+    - monotony: 7-day mean / 7-day standard deviation, NaN when the load did not vary
+    - strain: 7-day total load x monotony
+    """
+    weekly_total = _rolling_sum(matrix, ACUTE_DAYS)
+    acute = weekly_total / ACUTE_DAYS
+    chronic = _rolling_sum(matrix, CHRONIC_DAYS) / CHRONIC_DAYS
+    
+    weekly_squares = _rolling_sum(matrix ** 2, ACUTE_DAYS)
+    variance = np.maximum(weekly_squares / ACUTE_DAYS - acute ** 2, 0.0)
+    std = np.sqrt(variance)
+    
+    with np.errstate(invalid="ignore", divide="ignore"):
+        acwr = np.where(chronic > 0, acute / chronic, np.nan)
+        monotony = np.where(std > 1e-9, acute / std, np.nan)
+    strain = weekly_total * monotony
+    
+    return {
+        "daily_load": matrix,
+        "acute_load": acute,
+        "chronic_load": chronic,
+        "acwr": acwr,
+        "monotony": monotony,
+        "strain": strain,
+    }
+
+
+def load_summaries(athlete_ids: List[str], metrics: Dict[str, np.ndarray], first_day: datetime) -> List[dict]:
+    """Latest-day load metrics for every athlete, as LoadSummary fields."""
+    last = metrics["daily_load"].shape[1] - 1
+    date = (first_day + timedelta(days=last)).strftime('%Y-%m-%d')
+    columns = {name: to_optional_list(np.round(values[:, last], 2)) for name, values in metrics.items()}
+    return [
+        {"athlete_id": athlete_id, "date": date, **{name: column[i] for name, column in columns.items()}}
+        for i, athlete_id in enumerate(athlete_ids)
+    ]
+
+
+def load_series(metrics: Dict[str, np.ndarray], row: int, first_day: datetime, days: int) -> dict:
+    """The last `days` days of one athlete's load metrics, as AthleteLoad series."""
+    total_days = metrics["daily_load"].shape[1]
+    start = total_days - days
+    return {
+        "dates": [(first_day + timedelta(days=day)).strftime('%Y-%m-%d') for day in range(start, total_days)],
+        **{name: to_optional_list(np.round(values[row, start:], 2)) for name, values in metrics.items()}
+    }
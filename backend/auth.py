@@ -1,20 +1,41 @@
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
+import math
+import time
+import uuid
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends, Request
 from fastapi.security import HTTPBearer
 from models import User, TokenData, UserRole
+from cache import LRUCache
+from revocation import revocation_list
+from profiling import phase
 import os
-from typing import Optional
+from typing import Optional, Callable, Any, Dict, Tuple
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt cost, shared by every process. Startup only reports the cost that would
+# take about BCRYPT_TARGET_MS on this machine, so it never varies between processes
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
 # JWT settings
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
+# Verified tokens are cached until their exp (capped by the TTL) so repeat
+# requests skip the signature check and claim parsing
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv("TOKEN_CACHE_MAX_ENTRIES", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "300"))
+
 security = HTTPBearer()
 
 class AuthError(Exception):
@@ -30,6 +51,102 @@ def get_password_hash(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password and, when its hash is weaker than the configured cost, return a new hash."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def calibrate_bcrypt_rounds(target_ms: float = BCRYPT_TARGET_MS) -> int:
+    """Pick the bcrypt cost whose hash time is closest to, without exceeding, target_ms.
+    
+    Each extra round doubles the work, so the cheapest allowed cost is timed and
+    the rest is extrapolated instead of timing every candidate.
+    """
+    sampler = CryptContext(schemes=["bcrypt"], bcrypt__rounds=BCRYPT_MIN_ROUNDS)
+    samples = []
+    for _ in range(3):
+        started = time.perf_counter()
+        sampler.hash("calibration")
+        samples.append((time.perf_counter() - started) * 1000)
+    
+    rounds = BCRYPT_MIN_ROUNDS + math.floor(math.log2(max(target_ms / min(samples), 1)))
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, rounds))
+
+def configure_bcrypt_rounds(rounds: int):
+    """Hash new passwords with this cost and flag stored hashes below it for rehashing.
+    
+    There is no maximum, so stronger hashes are never rewritten at a lower cost.
+    """
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+
+def setup_password_hashing() -> Tuple[int, int]:
+    """Apply BCRYPT_ROUNDS; returns it with the cost calibration suggests for this machine."""
+    configure_bcrypt_rounds(BCRYPT_ROUNDS)
+    return BCRYPT_ROUNDS, calibrate_bcrypt_rounds()
+
+class PasswordHasherBusy(Exception):
+    pass
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so hashing never blocks the event loop.
+    
+    At most max_workers hashes run at once; up to max_queue more wait their turn
+    and anything beyond that is rejected instead of piling up.
+    """
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = asyncio.Semaphore(max_workers)
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.max_queue_depth = 0
+    
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise PasswordHasherBusy("Too many concurrent password checks")
+        
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._slots.release()
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "max_queue_depth": self.max_queue_depth
+        }
+
+password_hasher = PasswordHasher(
+    max_workers=int(os.getenv("PASSWORD_HASH_WORKERS", "2")),
+    max_queue=int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "100"))
+)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password off the event loop."""
+    return await password_hasher.run(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password off the event loop."""
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -38,12 +155,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": str(uuid.uuid4())})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+token_cache = LRUCache(TOKEN_CACHE_MAX_ENTRIES, TOKEN_CACHE_TTL_SECONDS)
+
+def token_cache_key(token: str) -> str:
+    """Digest of the whole token, so any tampered byte maps to another entry."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
 def verify_token(token: str) -> TokenData:
     """Verify and decode a JWT token."""
+    token_data, _ = decode_token(token)
+    return token_data
+
+def verify_token_cached(token: str) -> TokenData:
+    """verify_token backed by token_cache; entries never outlive the token's exp."""
+    key = token_cache_key(token)
+    token_data = token_cache.get(key)
+    if token_data is not None:
+        return token_data
+    
+    token_data, expires_at = decode_token(token)
+    if expires_at is not None:
+        token_cache.set(key, token_data, min(TOKEN_CACHE_TTL_SECONDS, expires_at - time.time()))
+    return token_data
+
+def decode_token(token: str) -> Tuple[TokenData, Optional[float]]:
+    """Verify a JWT token and return its claims together with its exp timestamp."""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -56,12 +196,13 @@ def verify_token(token: str) -> TokenData:
         token_data = TokenData(
             user_id=user_id,
             email=email,
-            role=UserRole(role) if role else None
+            role=UserRole(role) if role else None,
+            jti=payload.get("jti")
         )
-        return token_data
+        return token_data, payload.get("exp")
     except jwt.ExpiredSignatureError:
         raise AuthError("Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise AuthError("Invalid token")
 
 def get_token_from_request(request: Request) -> Optional[str]:
@@ -80,6 +221,10 @@ def get_token_from_request(request: Request) -> Optional[str]:
 
 async def get_current_user(request: Request) -> TokenData:
     """Get current user from request."""
+    with phase("auth"):
+        return _authenticate(request)
+
+def _authenticate(request: Request) -> TokenData:
     token = get_token_from_request(request)
     
     if not token:
@@ -90,14 +235,23 @@ async def get_current_user(request: Request) -> TokenData:
         )
     
     try:
-        token_data = verify_token(token)
-        return token_data
+        token_data = verify_token_cached(token)
     except AuthError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=e.message,
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Checked on every request, cached or not, against the in-memory revocation list
+    if revocation_list.is_revoked(token_data.jti):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    return token_data
 
 async def get_current_coach(request: Request) -> TokenData:
     """Get current user and ensure they are a coach."""
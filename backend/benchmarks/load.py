@@ -0,0 +1,375 @@
+"""
+Concurrent load test of the API, driven in process over ASGI.
+
+Seeds a synthetic dataset (see generate_data.py), then runs a weighted mix of
+requests covering every API route, including registration, login and logout
+(bcrypt pool and revocation list), all writes and all deletes, with a fixed
+number of concurrent clients. Reports p50/p95/p99 latency, requests/sec and
+database calls per request. --scenarios restricts the mix to routes matching
+a substring, e.g. --scenarios GET for reads only.
+
+Run from the backend directory, against a throwaway local MongoDB database:
+    python -m benchmarks.load --mongo-url mongodb://localhost:27017 --requests 5000 --output before.json
+or on the in-memory storage backend:
+    python -m benchmarks.load --requests 5000 --output before.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+from auth import create_access_token, get_password_hash_async
+from database import db_manager, COLLECTIONS
+from generate_data import generate_data
+from metrics import pool_listener
+from models import UserRole
+from server import app
+from storage import create_backend
+
+BENCHMARK_DB_NAME = "athletica_benchmark"
+BENCHMARK_PASSWORD = "Benchmark123!"
+# Exercises and session templates created for the update and delete scenarios
+SEEDED_LIBRARY_ITEMS = 200
+
+# Database calls made while serving the current request
+_db_calls: ContextVar[Optional[List[int]]] = ContextVar("benchmark_db_calls", default=None)
+
+
+def count_db_call(operation: str, collection: str, duration: float, failed: bool):
+    calls = _db_calls.get()
+    if calls is not None:
+        calls[0] += 1
+
+
+class Workload:
+    """Ids sampled from the seeded data, used to build realistic requests."""
+    def __init__(self, rng: random.Random, ids: Dict[str, List[str]], coach: dict):
+        self.rng = rng
+        self.ids = ids
+        self.coach = coach
+    
+    def pick(self, collection: str) -> str:
+        return self.rng.choice(self.ids[collection])
+    
+    def take(self, collection: str) -> str:
+        """Id of a document to delete; it is no longer picked by other scenarios."""
+        ids = self.ids[collection]
+        if len(ids) <= 1:
+            return str(uuid.uuid4())  # Answered with a 404 and counted as an error
+        return ids.pop(self.rng.randrange(len(ids)))
+    
+    def fresh_token(self) -> dict:
+        """Headers with a token of its own, for logouts that revoke it."""
+        token = create_access_token({"sub": self.coach['id'], "email": self.coach['email'], "role": self.coach['role']})
+        return {"Authorization": f"Bearer {token}"}
+    
+    def new_user(self) -> dict:
+        return {
+            "role": UserRole.COACH.value,
+            "email": f"bench-{uuid.uuid4().hex}@example.com",
+            "password": BENCHMARK_PASSWORD,
+            "first_name": "Bench",
+            "last_name": "User"
+        }
+    
+    def new_athlete(self) -> dict:
+        return {
+            "first_name": self.rng.choice(["Sara", "Milan", "Elena", "Okan"]),
+            "last_name": f"Bench{self.rng.randint(1, 9999)}",
+            "sector": self.rng.choice(["sprint", "jumps", "throws"])
+        }
+    
+    def new_goal(self) -> dict:
+        start = datetime.utcnow()
+        return {
+            "athlete_id": self.pick('athletes'),
+            "name": "Benchmark goal",
+            "type": "performance",
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(days=120)).isoformat(),
+            "priority": self.rng.choice(["high", "medium", "low"])
+        }
+    
+    def new_program(self) -> dict:
+        start = datetime.utcnow()
+        return {
+            "athlete_id": self.pick('athletes'),
+            "name": "Benchmark program",
+            "start_date": start.isoformat(),
+            "end_date": (start + timedelta(weeks=8)).isoformat(),
+            "weekly_frequency": self.rng.randint(2, 6)
+        }
+    
+    def new_session(self) -> dict:
+        start = datetime.utcnow() + timedelta(days=self.rng.randint(-60, 14))
+        return {
+            "program_id": self.pick('programs'),
+            "athlete_id": self.pick('athletes'),
+            "title": "Benchmark session",
+            "type": "speed",
+            "start": start.isoformat(),
+            "end": (start + timedelta(minutes=90)).isoformat(),
+            "intensity": self.rng.randint(1, 10),
+            "tags": ["benchmark"]
+        }
+    
+    def new_exercise(self) -> dict:
+        return {"name": f"Benchmark exercise {self.rng.randint(1, 9999)}", "category": "legs", "muscles": ["quadriceps"]}
+    
+    def new_template(self) -> dict:
+        return {"name": "Benchmark template", "type": "gym", "duration_min": 60, "intensity": 6, "tags": ["benchmark"]}
+    
+    def new_assessment(self) -> dict:
+        return {
+            "athlete_id": self.pick('athletes'),
+            "date": datetime.utcnow().isoformat(),
+            "strength_max": self.rng.randint(1, 10),
+            "speed_linear": self.rng.randint(1, 10),
+            "endurance_aerobic": self.rng.randint(1, 10)
+        }
+    
+    def new_record(self) -> dict:
+        return {"athlete_id": self.pick('athletes'), "discipline": "100m", "value": "11.00", "date": datetime.utcnow().isoformat()}
+
+
+Request = Tuple[str, str, dict]
+
+# Weighted request mix covering every route: name -> (weight, builder returning method, url and httpx kwargs).
+# Deletes take their target out of the sampled ids, so no later request expects it to exist.
+SCENARIOS: Dict[str, Tuple[int, Callable[[Workload], Request]]] = {
+    "GET /": (1, lambda w: ("GET", "/api/", {})),
+    "POST /auth/register": (1, lambda w: ("POST", "/api/auth/register", {"json": w.new_user()})),
+    "POST /auth/login": (1, lambda w: ("POST", "/api/auth/login", {"json": {"email": w.coach['email'], "password": BENCHMARK_PASSWORD}})),
+    "POST /auth/logout": (1, lambda w: ("POST", "/api/auth/logout", {"headers": w.fresh_token()})),
+    "GET /auth/me": (5, lambda w: ("GET", "/api/auth/me", {})),
+    "GET /athletes": (6, lambda w: ("GET", "/api/athletes", {"params": {"limit": 100}})),
+    "GET /athletes/search": (6, lambda w: ("GET", "/api/athletes/search", {"params": {"q": w.rng.choice(["sa", "mil", "elena", "ok"])}})),
+    "GET /athletes/{id}": (10, lambda w: ("GET", f"/api/athletes/{w.pick('athletes')}", {})),
+    "POST /athletes": (1, lambda w: ("POST", "/api/athletes", {"json": w.new_athlete()})),
+    "PUT /athletes/{id}": (2, lambda w: ("PUT", f"/api/athletes/{w.pick('athletes')}", {"json": {"notes": f"Benchmark note {w.rng.random():.4f}"}})),
+    "DELETE /athletes/{id}": (1, lambda w: ("DELETE", f"/api/athletes/{w.take('athletes')}", {})),
+    "GET /goals": (3, lambda w: ("GET", "/api/goals", {"params": {"athlete_id": w.pick('athletes')}})),
+    "POST /goals": (1, lambda w: ("POST", "/api/goals", {"json": w.new_goal()})),
+    "PUT /goals/{id}": (1, lambda w: ("PUT", f"/api/goals/{w.pick('goals')}", {"json": {"current_value": f"{w.rng.uniform(10, 12):.2f}"}})),
+    "DELETE /goals/{id}": (1, lambda w: ("DELETE", f"/api/goals/{w.take('goals')}", {})),
+    "GET /programs": (3, lambda w: ("GET", "/api/programs", {"params": {"athlete_id": w.pick('athletes')}})),
+    "POST /programs": (1, lambda w: ("POST", "/api/programs", {"json": w.new_program()})),
+    "PUT /programs/{id}": (1, lambda w: ("PUT", f"/api/programs/{w.pick('programs')}", {"json": {"notes": "Benchmark note"}})),
+    "DELETE /programs/{id}": (1, lambda w: ("DELETE", f"/api/programs/{w.take('programs')}", {})),
+    "GET /sessions": (12, lambda w: ("GET", "/api/sessions", {"params": {"athlete_id": w.pick('athletes'), "limit": 100}})),
+    "POST /sessions": (5, lambda w: ("POST", "/api/sessions", {"json": w.new_session()})),
+    "PUT /sessions/{id}": (5, lambda w: ("PUT", f"/api/sessions/{w.pick('sessions')}", {"json": {"status": "done", "rpe": w.rng.randint(1, 10), "duration_min": 80}})),
+    "POST /sessions/bulk": (1, lambda w: ("POST", "/api/sessions/bulk", {"json": {"create": [w.new_session() for _ in range(20)]}})),
+    "DELETE /sessions/{id}": (1, lambda w: ("DELETE", f"/api/sessions/{w.take('sessions')}", {})),
+    "GET /exercises": (2, lambda w: ("GET", "/api/exercises", {})),
+    "POST /exercises": (1, lambda w: ("POST", "/api/exercises", {"json": w.new_exercise()})),
+    "PUT /exercises/{id}": (1, lambda w: ("PUT", f"/api/exercises/{w.pick('exercises')}", {"json": {"description": "Benchmark description"}})),
+    "DELETE /exercises/{id}": (1, lambda w: ("DELETE", f"/api/exercises/{w.take('exercises')}", {})),
+    "GET /assessments": (4, lambda w: ("GET", "/api/assessments", {"params": {"athlete_id": w.pick('athletes')}})),
+    "POST /assessments": (1, lambda w: ("POST", "/api/assessments", {"json": w.new_assessment()})),
+    "POST /assessments/bulk": (1, lambda w: ("POST", "/api/assessments/bulk", {"json": {"create": [w.new_assessment() for _ in range(20)]}})),
+    "PUT /assessments/{id}": (1, lambda w: ("PUT", f"/api/assessments/{w.pick('physical_assessments')}", {"json": w.new_assessment()})),
+    "DELETE /assessments/{id}": (1, lambda w: ("DELETE", f"/api/assessments/{w.take('physical_assessments')}", {})),
+    "GET /records": (4, lambda w: ("GET", "/api/records", {"params": {"athlete_id": w.pick('athletes')}})),
+    "POST /records": (2, lambda w: ("POST", "/api/records", {"json": w.new_record()})),
+    "POST /records/bulk": (1, lambda w: ("POST", "/api/records/bulk", {"json": {"create": [w.new_record() for _ in range(20)]}})),
+    "DELETE /records/{id}": (1, lambda w: ("DELETE", f"/api/records/{w.take('personal_records')}", {})),
+    "GET /templates/sessions": (2, lambda w: ("GET", "/api/templates/sessions", {})),
+    "POST /templates/sessions": (1, lambda w: ("POST", "/api/templates/sessions", {"json": w.new_template()})),
+    "DELETE /templates/sessions/{id}": (1, lambda w: ("DELETE", f"/api/templates/sessions/{w.take('session_templates')}", {})),
+    "GET /analytics/athlete/{id}/overview": (6, lambda w: ("GET", f"/api/analytics/athlete/{w.pick('athletes')}/overview", {})),
+    "GET /analytics/roster/overview": (2, lambda w: ("GET", "/api/analytics/roster/overview", {})),
+    "GET /analytics/athlete/{id}/assessments": (4, lambda w: ("GET", f"/api/analytics/athlete/{w.pick('athletes')}/assessments", {"params": {"stats": "rolling_mean,delta,slope"}})),
+    "GET /analytics/athlete/{id}/weekly": (4, lambda w: ("GET", f"/api/analytics/athlete/{w.pick('athletes')}/weekly", {})),
+    "GET /analytics/athlete/{id}/load": (4, lambda w: ("GET", f"/api/analytics/athlete/{w.pick('athletes')}/load", {})),
+    "GET /analytics/load": (1, lambda w: ("GET", "/api/analytics/load", {})),
+    "GET /admin/cache": (1, lambda w: ("GET", "/api/admin/cache", {})),
+    "GET /admin/password-hashing": (1, lambda w: ("GET", "/api/admin/password-hashing", {})),
+    "GET /admin/token-cache": (1, lambda w: ("GET", "/api/admin/token-cache", {})),
+    "GET /admin/slow-queries": (1, lambda w: ("GET", "/api/admin/slow-queries", {})),
+    "GET /metrics": (1, lambda w: ("GET", "/metrics", {})),
+}
+
+def percentiles(latencies: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 2), "p95_ms": round(float(p95), 2), "p99_ms": round(float(p99), 2)}
+
+
+async def use_database(mongo_url: Optional[str], db_name: str):
+    """Point db_manager at a fresh benchmark database, monitored like the server's."""
+    backend = create_backend("mongo" if mongo_url else "memory", mongo_url, db_name)
+    if hasattr(backend, "event_listeners"):
+        # Listeners must be in place before the client is created
+        backend.event_listeners.append(pool_listener)
+        await backend.db.client.drop_database(db_name)
+    db_manager.backend = backend
+
+
+async def seed(args) -> Tuple[Dict[str, List[str]], dict, str]:
+    """Load the synthetic dataset and return sampled ids, the coach and a coach token."""
+    counts = await generate_data(args.athletes, args.years, args.sessions_per_week, args.seed)
+    print(f"Seeded {sum(counts.values())} documents")
+    
+    coach = {
+        "id": str(uuid.uuid4()),
+        "role": UserRole.COACH.value,
+        "email": "benchmark@example.com",
+        "hashed_password": await get_password_hash_async(BENCHMARK_PASSWORD),
+        "first_name": "Bench",
+        "last_name": "Mark"
+    }
+    await db_manager.create_document(COLLECTIONS['users'], coach)
+    token = create_access_token({"sub": coach['id'], "email": coach['email'], "role": coach['role']})
+    
+    # The generator creates no exercise library or templates
+    for i in range(SEEDED_LIBRARY_ITEMS):
+        await db_manager.create_document(COLLECTIONS['exercises'], {
+            "id": str(uuid.uuid4()), "name": f"Exercise {i}", "category": "other", "muscles": []
+        })
+        await db_manager.create_document(COLLECTIONS['session_templates'], {
+            "id": str(uuid.uuid4()), "name": f"Template {i}", "type": "gym", "duration_min": 60, "tags": [], "exercises": []
+        })
+    
+    ids = {}
+    for name in ('athletes', 'goals', 'programs', 'sessions', 'exercises', 'physical_assessments', 'personal_records', 'session_templates'):
+        documents = await db_manager.find_documents(COLLECTIONS[name], {}, limit=None, fields=["id"])
+        ids[name] = [document['id'] for document in documents]
+    return ids, coach, token
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    workload: Workload,
+    names: List[str],
+    total: int,
+    concurrency: int
+) -> Tuple[dict, float]:
+    """Send `total` requests from `concurrency` workers; returns per-scenario samples and wall time."""
+    weights = [SCENARIOS[name][0] for name in names]
+    plan = workload.rng.choices(names, weights=weights, k=total)
+    samples = {name: {"latencies": [], "db_calls": [], "errors": 0} for name in names}
+    queue = iter(plan)
+    
+    async def worker():
+        for name in queue:
+            method, url, kwargs = SCENARIOS[name][1](workload)
+            calls = [0]
+            context = _db_calls.set(calls)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            finally:
+                elapsed = time.perf_counter() - started
+                _db_calls.reset(context)
+            
+            sample = samples[name]
+            sample["latencies"].append(elapsed)
+            sample["db_calls"].append(calls[0])
+            sample["errors"] += failed
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples: dict, elapsed: float) -> dict:
+    routes = {}
+    latencies, db_calls, errors = [], [], 0
+    for name, sample in samples.items():
+        if not sample["latencies"]:
+            continue
+        routes[name] = {
+            "requests": len(sample["latencies"]),
+            "errors": sample["errors"],
+            **percentiles(sample["latencies"]),
+            "db_calls_per_request": round(float(np.mean(sample["db_calls"])), 2)
+        }
+        latencies += sample["latencies"]
+        db_calls += sample["db_calls"]
+        errors += sample["errors"]
+    
+    total = {
+        "requests": len(latencies),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        **percentiles(latencies),
+        "db_calls_per_request": round(float(np.mean(db_calls)), 2)
+    }
+    return {"total": total, "routes": routes}
+
+
+def print_report(report: dict):
+    print(f"{'route':<42} {'reqs':>6} {'err':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'db/req':>7}")
+    rows = sorted(report["routes"].items()) + [("TOTAL", report["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<42} {row['requests']:>6} {row['errors']:>5} "
+            f"{row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['db_calls_per_request']:>7.2f}"
+        )
+    print(f"{report['total']['requests_per_s']} requests/s")
+
+
+async def main(args):
+    names = [name for name in SCENARIOS if not args.scenarios or any(part in name for part in args.scenarios)]
+    if not names:
+        raise SystemExit(f"No scenario matches {args.scenarios}")
+    
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one log line per request otherwise
+    await use_database(args.mongo_url, args.db_name)
+    await app.router.startup()
+    try:
+        ids, coach, token = await seed(args)
+        workload = Workload(random.Random(args.seed), ids, coach)
+        
+        db_manager.add_listener(count_db_call)
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {token}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", headers=headers) as client:
+            if args.warmup:
+                await run_load(client, workload, names, args.warmup, args.concurrency)
+            samples, elapsed = await run_load(client, workload, names, args.requests, args.concurrency)
+        db_manager.remove_listener(count_db_call)
+    finally:
+        await app.router.shutdown()
+    
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "backend": "mongodb" if args.mongo_url else "in-memory",
+        "finished_at": datetime.utcnow().isoformat(),
+        **summarize(samples, elapsed)
+    }
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mongo-url", help="MongoDB to run against; in-memory when omitted")
+    parser.add_argument("--db-name", default=BENCHMARK_DB_NAME, help="database to (re)create for the run")
+    parser.add_argument("--athletes", type=int, default=50, help="athletes in the seeded dataset")
+    parser.add_argument("--years", type=float, default=1, help="years of history per athlete")
+    parser.add_argument("--sessions-per-week", type=int, default=5, help="sessions per athlete per week")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the dataset and the request mix")
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=100, help="unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=10, help="concurrent clients")
+    parser.add_argument("--scenarios", nargs="+", help="only run scenarios whose name contains one of these, e.g. GET /auth")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    asyncio.run(main(parser.parse_args()))
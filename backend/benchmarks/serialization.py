@@ -0,0 +1,85 @@
+"""
+Micro-benchmark of the read path for a page of sessions.
+
+Compares the previous path (build models, then let FastAPI validate and
+serialize them again for response_model) with the trusted orjson path.
+
+Run from the backend directory:
+    python -m benchmarks.serialization --count 1000
+"""
+
+import argparse
+import json
+import timeit
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from models import Session, SessionType, SessionStatus
+from serialization import trusted_dump, dumps
+
+
+def make_sessions(count: int) -> List[dict]:
+    """Session documents shaped like the ones read back from MongoDB."""
+    start = datetime(2024, 1, 1, 9, 0)
+    types = [session_type.value for session_type in SessionType]
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "created_at": start,
+            "updated_at": start,
+            "program_id": str(uuid.uuid4()),
+            "athlete_id": str(uuid.uuid4()),
+            "title": f"Session {i}",
+            "type": types[i % len(types)],
+            "start": start + timedelta(days=i),
+            "end": start + timedelta(days=i, hours=1, minutes=30),
+            "intensity": i % 10 + 1,
+            "tags": ["block-a", "speed"],
+            "status": SessionStatus.DONE.value,
+            "notes": "Felt strong through the last reps",
+            "rpe": i % 10 + 1,
+            "duration_min": 90
+        }
+        for i in range(count)
+    ]
+
+
+def old_path(documents: List[dict], adapter: TypeAdapter) -> bytes:
+    """Model construction in the route, then FastAPI's response_model validation and encoding."""
+    models = [Session(**document) for document in documents]
+    content = [model.model_dump() for model in models]
+    value = adapter.validate_python(content)
+    return json.dumps(jsonable_encoder(adapter.dump_python(value, mode="json"))).encode()
+
+
+def new_path(documents: List[dict]) -> bytes:
+    return dumps([trusted_dump(Session, document) for document in documents])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000, help="sessions per response")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per path")
+    args = parser.parse_args()
+    
+    documents = make_sessions(args.count)
+    adapter = TypeAdapter(List[Session])
+    
+    # Both paths must produce the same payload
+    assert json.loads(old_path(documents, adapter)) == json.loads(new_path(documents))
+    
+    old = min(timeit.repeat(lambda: old_path(documents, adapter), number=1, repeat=args.repeat))
+    new = min(timeit.repeat(lambda: new_path(documents), number=1, repeat=args.repeat))
+    
+    print(f"{args.count} sessions, best of {args.repeat}")
+    print(f"  validated path: {old * 1000:8.2f} ms")
+    print(f"  trusted path:   {new * 1000:8.2f} ms")
+    print(f"  speedup:        {old / new:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
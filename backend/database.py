@@ -1,107 +1,375 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+import asyncio
+import argparse
+import functools
 import os
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Tuple, AsyncIterator, Callable
 from datetime import datetime
 from dotenv import load_dotenv
 from pathlib import Path
+from cache import LRUCache
+from slow_queries import SlowQueryLog
+from storage import StorageBackend, create_backend, index_name
+from pagination import encode_cursor, decode_cursor, keyset_query, STREAM_BATCH_SIZE
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ.get('DB_NAME', 'athletica')]
+# Called with (operation, collection, duration in seconds, failed) after each database call
+DatabaseListener = Callable[[str, str, float, bool], None]
+
+
+def instrumented(method):
+    """Report every call of a DatabaseManager method to its listeners."""
+    @functools.wraps(method)
+    async def wrapper(self, collection: str, *args, **kwargs):
+        if not self.listeners:
+            return await method(self, collection, *args, **kwargs)
+        
+        started = time.perf_counter()
+        failed = False
+        try:
+            return await method(self, collection, *args, **kwargs)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._notify(method.__name__, collection, time.perf_counter() - started, failed)
+    return wrapper
+
 
 class DatabaseManager:
-    def __init__(self):
-        self.db = db
+    def __init__(
+        self,
+        backend: StorageBackend,
+        cache_config: Dict[str, dict] = None,
+        slow_queries: Optional[SlowQueryLog] = None
+    ):
+        self.backend = backend
+        self.slow_queries = slow_queries
+        self.caches = {
+            collection: LRUCache(config['max_entries'], config['ttl_seconds'])
+            for collection, config in (cache_config or {}).items()
+            if config.get('enabled')
+        }
+        self.listeners: List[DatabaseListener] = []
     
+    def add_listener(self, listener: DatabaseListener):
+        """Observe every database call, e.g. for metrics or per-request accounting."""
+        self.listeners.append(listener)
+    
+    def remove_listener(self, listener: DatabaseListener):
+        self.listeners.remove(listener)
+    
+    def _notify(self, operation: str, collection: str, duration: float, failed: bool):
+        for listener in self.listeners:
+            listener(operation, collection, duration, failed)
+    
+    @instrumented
     async def create_document(self, collection: str, document: dict) -> dict:
         """Create a new document in the specified collection."""
         document['created_at'] = datetime.utcnow()
         document['updated_at'] = datetime.utcnow()
-        result = await self.db[collection].insert_one(document)
-        document['_id'] = str(result.inserted_id)
+        await self.backend.insert_one(collection, document)
         return document
     
-    async def get_document(self, collection: str, doc_id: str) -> Optional[dict]:
-        """Get a document by ID."""
-        document = await self.db[collection].find_one({"id": doc_id})
-        if document:
-            document.pop('_id', None)  # Remove MongoDB ObjectId
-        return document
+    @instrumented
+    async def create_documents(self, collection: str, documents: List[dict]) -> List[Optional[str]]:
+        """Insert many documents in one unordered round trip.
+        
+        Returns one error message per document, None where the insert succeeded.
+        """
+        now = datetime.utcnow()
+        for document in documents:
+            document['created_at'] = now
+            document['updated_at'] = now
+        
+        return await self.backend.insert_many(collection, documents)
     
-    async def get_documents(self, collection: str, filter_query: dict = None, limit: int = 1000) -> List[dict]:
-        """Get documents with optional filtering."""
-        if filter_query is None:
-            filter_query = {}
+    @instrumented
+    async def bulk_write(
+        self,
+        collection: str,
+        creates: Optional[List[dict]] = None,
+        updates: Optional[List[Tuple[str, dict]]] = None
+    ) -> List[Optional[str]]:
+        """Apply inserts and partial updates by ID in one unordered round trip.
         
-        cursor = self.db[collection].find(filter_query).limit(limit)
-        documents = await cursor.to_list(length=limit)
+        Returns one error message per operation (creates first, then updates),
+        None where the operation succeeded.
+        """
+        creates = list(creates or [])
+        updates = list(updates or [])
+        now = datetime.utcnow()
+        for document in creates:
+            document['created_at'] = now
+            document['updated_at'] = now
+        for _, update_data in updates:
+            update_data['updated_at'] = now
         
-        # Remove MongoDB ObjectIds
-        for doc in documents:
-            doc.pop('_id', None)
+        errors = await self.backend.bulk_write(collection, creates, updates)
+        for doc_id, _ in updates:
+            self._refresh_cache(collection, doc_id, None)
+        return errors
+    
+    @instrumented
+    async def get_document(self, collection: str, doc_id: str, fields: Optional[List[str]] = None) -> Optional[dict]:
+        """Get a document by ID, optionally projected to the given fields.
         
-        return documents
+        Served from the collection's document cache when one is configured.
+        """
+        cache = self.caches.get(collection)
+        if cache is None:
+            return await self.backend.find_one(collection, {"id": doc_id}, fields)
+        
+        document = cache.get(doc_id)
+        if document is None:
+            document = await self.backend.find_one(collection, {"id": doc_id})
+            if document is None:
+                return None
+            cache.set(doc_id, document)
+        
+        # Hand out copies so callers cannot mutate the cached entry
+        if fields:
+            return {field: document[field] for field in fields if field in document}
+        return dict(document)
     
-    async def update_document(self, collection: str, doc_id: str, update_data: dict) -> Optional[dict]:
-        """Update a document by ID."""
+    @instrumented
+    async def get_documents(self, collection: str, filter_query: dict = None, limit: int = 1000) -> List[dict]:
+        """Get documents with optional filtering."""
+        return await self.backend.find(collection, filter_query or {}, limit=limit)
+    
+    @instrumented
+    async def update_document(
+        self,
+        collection: str,
+        doc_id: str,
+        update_data: dict,
+        fields: Optional[List[str]] = None
+    ) -> Optional[dict]:
+        """Update a document by ID and return it as it is after the update."""
         update_data['updated_at'] = datetime.utcnow()
         
-        result = await self.db[collection].update_one(
-            {"id": doc_id},
-            {"$set": update_data}
-        )
-        
-        if result.matched_count > 0:
-            return await self.get_document(collection, doc_id)
-        return None
+        document = await self.backend.update_one(collection, doc_id, update_data, fields)
+        self._refresh_cache(collection, doc_id, None if fields else document)
+        return document
     
+    @instrumented
     async def delete_document(self, collection: str, doc_id: str) -> bool:
         """Delete a document by ID."""
-        result = await self.db[collection].delete_one({"id": doc_id})
-        return result.deleted_count > 0
+        deleted = await self.backend.delete_one(collection, doc_id)
+        self._refresh_cache(collection, doc_id, None)
+        return deleted
+    
+    @instrumented
+    async def delete_documents(self, collection: str, query: dict) -> int:
+        """Delete every document matching a query."""
+        deleted = await self.backend.delete_many(collection, query)
+        cache = self.caches.get(collection)
+        if cache is not None:
+            cache.clear()
+        return deleted
     
-    async def find_documents(self, collection: str, query: dict, limit: int = 1000) -> List[dict]:
-        """Find documents matching a query."""
-        cursor = self.db[collection].find(query).limit(limit)
-        documents = await cursor.to_list(length=limit)
+    @instrumented
+    async def update_document_with_previous(
+        self,
+        collection: str,
+        doc_id: str,
+        update_data: dict
+    ) -> Tuple[Optional[dict], Optional[dict]]:
+        """Update a document by ID and return it both before and after the update.
+        
+        The new version is derived from the old one, so this is still a single round trip.
+        """
+        update_data['updated_at'] = datetime.utcnow()
         
-        # Remove MongoDB ObjectIds
-        for doc in documents:
-            doc.pop('_id', None)
+        previous = await self.backend.update_one(collection, doc_id, update_data, return_previous=True)
+        if previous is None:
+            self._refresh_cache(collection, doc_id, None)
+            return None, None
         
+        document = {**previous, **update_data}
+        self._refresh_cache(collection, doc_id, document)
+        return previous, document
+    
+    @instrumented
+    async def pop_document(self, collection: str, doc_id: str) -> Optional[dict]:
+        """Delete a document by ID and return what was deleted."""
+        document = await self.backend.pop_one(collection, doc_id)
+        self._refresh_cache(collection, doc_id, None)
+        return document
+    
+    @instrumented
+    async def increment_documents(self, collection: str, increments: List[Tuple[dict, dict, dict]]):
+        """Apply ($inc, $setOnInsert) upserts for (filter, increments, defaults) triples in one round trip."""
+        if not increments:
+            return
+        
+        now = datetime.utcnow()
+        await self.backend.upsert_increments(collection, [
+            (query, inc, {"updated_at": now}, {**defaults, "created_at": now})
+            for query, inc, defaults in increments
+        ])
+    
+    @instrumented
+    async def find_documents(
+        self,
+        collection: str,
+        query: dict,
+        limit: Optional[int] = 1000,
+        fields: Optional[List[str]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None
+    ) -> List[dict]:
+        """Find documents matching a query, optionally projected to the given fields.
+        
+        A limit of None returns every match; callers must bound the query themselves.
+        """
+        started = time.perf_counter()
+        documents = await self.backend.find(collection, query, fields, sort, limit)
+        if self.slow_queries is not None:
+            self.slow_queries.observe_find(
+                self.backend, "find_documents", collection, query, sort, limit,
+                time.perf_counter() - started, len(documents)
+            )
         return documents
     
+    @instrumented
+    async def find_page(
+        self,
+        collection: str,
+        query: dict,
+        limit: int,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[dict], Optional[str]]:
+        """Find one page of documents in keyset order, returning the cursor for the next page."""
+        sort_keys = pagination_keys(collection)
+        if cursor:
+            query = keyset_query(query, sort_keys, decode_cursor(cursor, len(sort_keys)))
+        
+        # The sort keys are always fetched because the next cursor is built from them
+        fetched_fields = fields and list(dict.fromkeys(fields + sort_keys))
+        
+        # Fetch one extra document to know whether another page exists
+        sort = [(key, ASCENDING) for key in sort_keys]
+        started = time.perf_counter()
+        documents = await self.backend.find(collection, query, fetched_fields, sort, limit + 1)
+        if self.slow_queries is not None:
+            self.slow_queries.observe_find(
+                self.backend, "find_page", collection, query, sort, limit + 1,
+                time.perf_counter() - started, len(documents)
+            )
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = encode_cursor([documents[-1].get(key) for key in sort_keys])
+        
+        if fields:
+            for doc in documents:
+                for key in sort_keys:
+                    if key not in fields:
+                        doc.pop(key, None)
+        
+        return documents, next_cursor
+    
+    def iter_documents(
+        self,
+        collection: str,
+        query: dict,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        batch_size: int = STREAM_BATCH_SIZE
+    ) -> AsyncIterator[dict]:
+        """Iterate over matching documents in keyset order without materializing the result.
+        
+        The cursor token is validated eagerly, so errors surface before any output is produced.
+        """
+        sort_keys = pagination_keys(collection)
+        if cursor:
+            query = keyset_query(query, sort_keys, decode_cursor(cursor, len(sort_keys)))
+        
+        sort = [(key, ASCENDING) for key in sort_keys]
+        results = self.backend.iterate(collection, query, fields, sort, limit, batch_size)
+        return self._iterate(collection, results)
+    
+    async def _iterate(self, collection: str, results) -> AsyncIterator[dict]:
+        started = time.perf_counter()
+        failed = False
+        try:
+            async for document in results:
+                yield document
+        except Exception:
+            failed = True
+            raise
+        finally:
+            if self.listeners:
+                self._notify("iter_documents", collection, time.perf_counter() - started, failed)
+    
+    @instrumented
     async def find_one(self, collection: str, query: dict) -> Optional[dict]:
         """Find one document matching a query."""
-        document = await self.db[collection].find_one(query)
-        if document:
-            document.pop('_id', None)
-        return document
+        return await self.backend.find_one(collection, query)
     
+    @instrumented
     async def count_documents(self, collection: str, query: dict = None) -> int:
         """Count documents matching a query."""
-        if query is None:
-            query = {}
-        return await self.db[collection].count_documents(query)
+        return await self.backend.count(collection, query or {})
     
-    async def aggregate(self, collection: str, pipeline: List[dict]) -> List[dict]:
-        """Run an aggregation pipeline."""
-        cursor = self.db[collection].aggregate(pipeline)
-        documents = await cursor.to_list(length=1000)
-        
-        # Remove MongoDB ObjectIds
-        for doc in documents:
-            doc.pop('_id', None)
-        
-        return documents
-
-# Global database manager instance
-db_manager = DatabaseManager()
+    @instrumented
+    async def estimate_count(self, collection: str, query: dict = None) -> int:
+        """Cheap document count: collection metadata when unfiltered, an indexed count otherwise."""
+        return await self.backend.estimate_count(collection, query)
+    
+    @instrumented
+    async def aggregate(self, collection: str, pipeline: List[dict], limit: Optional[int] = 1000) -> List[dict]:
+        """Run an aggregation pipeline; a limit of None returns every result row."""
+        started = time.perf_counter()
+        rows = await self.backend.aggregate(collection, pipeline, limit)
+        if self.slow_queries is not None:
+            self.slow_queries.observe_aggregate(
+                self.backend, collection, pipeline, time.perf_counter() - started, len(rows)
+            )
+        return rows
+    
+    def _refresh_cache(self, collection: str, doc_id: str, document: Optional[dict]):
+        """Write a fresh copy of a document through to its cache, or drop the stale entry."""
+        cache = self.caches.get(collection)
+        if cache is None:
+            return
+        if document is None:
+            cache.invalidate(doc_id)
+        else:
+            cache.set(doc_id, dict(document))
+    
+    def cache_stats(self) -> Dict[str, dict]:
+        """Hit/miss/eviction counters for every document cache."""
+        return {collection: cache.stats() for collection, cache in self.caches.items()}
+    
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """Create every index declared in INDEXES. Safe to run on every startup."""
+        created = {}
+        for collection, specs in INDEXES.items():
+            created[collection] = await self.backend.create_indexes(collection, specs)
+        return created
+    
+    async def index_report(self) -> List[dict]:
+        """Compare declared indexes with the ones that exist in the database."""
+        report = []
+        for collection, specs in INDEXES.items():
+            existing = set(await self.backend.index_names(collection))
+            for spec in specs:
+                name = index_name(spec)
+                report.append({
+                    "collection": collection,
+                    "name": name,
+                    "keys": spec['keys'],
+                    "exists": name in existing
+                })
+        return report
 
 # Collection names
 COLLECTIONS = {
@@ -116,5 +384,123 @@ COLLECTIONS = {
     'physical_assessments': 'physical_assessments',
     'events': 'events',
     'event_entries': 'event_entries',
-    'session_templates': 'session_templates'
-}
\ No newline at end of file
+    'session_templates': 'session_templates',
+    'weekly_rollups': 'weekly_rollups',
+    'revoked_tokens': 'revoked_tokens'
+}
+
+# Sort key used for keyset pagination of each collection; "id" breaks ties
+PAGINATION_KEYS = {
+    COLLECTIONS['sessions']: 'start',
+    COLLECTIONS['personal_records']: 'date',
+    COLLECTIONS['physical_assessments']: 'date',
+}
+DEFAULT_PAGINATION_KEY = 'created_at'
+
+
+def pagination_keys(collection: str) -> List[str]:
+    """Sort keys used to page through a collection."""
+    return [PAGINATION_KEYS.get(collection, DEFAULT_PAGINATION_KEY), "id"]
+
+# Declarative index registry, applied idempotently by DatabaseManager.ensure_indexes()
+INDEXES = {
+    COLLECTIONS['users']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("email", ASCENDING)], "options": {"unique": True}},
+    ],
+    COLLECTIONS['athletes']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("created_at", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("sector", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("search_tokens", ASCENDING)]},
+    ],
+    COLLECTIONS['goals']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("created_at", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("athlete_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['programs']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("created_at", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("athlete_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['sessions']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("athlete_id", ASCENDING), ("start", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("program_id", ASCENDING), ("start", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("start", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['exercises']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("created_at", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("category", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['session_exercises']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("session_id", ASCENDING), ("order", ASCENDING)]},
+    ],
+    COLLECTIONS['personal_records']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("date", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("athlete_id", ASCENDING), ("date", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['physical_assessments']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("date", ASCENDING), ("id", ASCENDING)]},
+        {"keys": [("athlete_id", ASCENDING), ("date", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['events']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("date", ASCENDING)]},
+    ],
+    COLLECTIONS['event_entries']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("event_id", ASCENDING)]},
+        {"keys": [("athlete_id", ASCENDING)]},
+    ],
+    COLLECTIONS['session_templates']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        {"keys": [("created_at", ASCENDING), ("id", ASCENDING)]},
+    ],
+    COLLECTIONS['weekly_rollups']: [
+        {"keys": [("athlete_id", ASCENDING), ("iso_week", ASCENDING)], "options": {"unique": True}},
+    ],
+    COLLECTIONS['revoked_tokens']: [
+        {"keys": [("id", ASCENDING)], "options": {"unique": True}},
+        # MongoDB drops each revocation once the token it blocks has expired
+        {"keys": [("expires_at", ASCENDING)], "options": {"expireAfterSeconds": 0}},
+    ],
+}
+
+
+# Read-through document cache for rarely changing collections, enabled with DOCUMENT_CACHE_ENABLED
+DOCUMENT_CACHE_ENABLED = os.environ.get('DOCUMENT_CACHE_ENABLED', 'false').lower() == 'true'
+CACHE_CONFIG = {
+    COLLECTIONS['users']: {"enabled": DOCUMENT_CACHE_ENABLED, "max_entries": 1000, "ttl_seconds": 60},
+    COLLECTIONS['athletes']: {"enabled": DOCUMENT_CACHE_ENABLED, "max_entries": 5000, "ttl_seconds": 300},
+    COLLECTIONS['exercises']: {"enabled": DOCUMENT_CACHE_ENABLED, "max_entries": 2000, "ttl_seconds": 600},
+    COLLECTIONS['session_templates']: {"enabled": DOCUMENT_CACHE_ENABLED, "max_entries": 500, "ttl_seconds": 600},
+}
+
+# Global database manager instance; STORAGE_BACKEND picks MongoDB (default) or the in-memory engine
+db_manager = DatabaseManager(create_backend(), CACHE_CONFIG, SlowQueryLog())
+
+
+async def _print_index_report(apply: bool):
+    if apply:
+        await db_manager.ensure_indexes()
+    
+    missing = 0
+    for entry in await db_manager.index_report():
+        keys = ", ".join(f"{field}:{direction}" for field, direction in entry['keys'])
+        state = "ok" if entry['exists'] else "MISSING"
+        missing += not entry['exists']
+        print(f"{state:8} {entry['collection']:22} {entry['name']:28} ({keys})")
+    print(f"{missing} missing index(es)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report or apply the declared MongoDB indexes.")
+    parser.add_argument("--apply", action="store_true", help="create missing indexes before reporting")
+    args = parser.parse_args()
+    asyncio.run(_print_index_report(args.apply))
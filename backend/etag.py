@@ -0,0 +1,61 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+# Fields needed to compute a validator without loading the whole document
+ETAG_FIELDS = ["id", "updated_at"]
+
+
+def _version(document: dict) -> str:
+    updated_at = document.get('updated_at')
+    if isinstance(updated_at, datetime):
+        updated_at = updated_at.isoformat()
+    return f"{document.get('id')}@{updated_at}"
+
+
+def document_etag(document: dict) -> str:
+    """Weak ETag for a single document, derived from its id and updated_at."""
+    digest = hashlib.sha1(_version(document).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def list_etag(documents: Iterable[dict], variant: str = "") -> str:
+    """Weak ETag for a list response, derived from the id/updated_at pairs and their count.
+    
+    The variant (typically the query string) keeps different views of the same
+    documents, such as different field projections, from sharing a validator.
+    """
+    digest = hashlib.sha1(variant.encode())
+    count = 0
+    for document in documents:
+        digest.update(b"\n" + _version(document).encode())
+        count += 1
+    digest.update(f"\n{count}".encode())
+    return f'W/"{digest.hexdigest()[:20]}"'
+
+
+def if_none_match(request: Request) -> Optional[str]:
+    return request.headers.get("if-none-match")
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    return Response(status_code=304, headers={**(headers or {}), "ETag": etag})
@@ -0,0 +1,319 @@
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from database import db_manager, COLLECTIONS
+from models import Sex, GoalType, Priority, ProgramStatus, SessionType, SessionStatus
+from analytics import ASSESSMENT_METRICS
+from rollups import rebuild_rollups
+from seed_data import (
+    athlete_document, goal_document, program_document, session_document, assessment_document, record_document
+)
+
+FIRST_NAMES = [
+    "Sarah", "Marcus", "Elena", "James", "Aisha", "Lucas", "Maya", "Noah", "Chloe", "Omar",
+    "Ines", "Mateo", "Hana", "Liam", "Zoe", "Kofi", "Freya", "Ravi", "Lena", "Tomás"
+]
+LAST_NAMES = [
+    "Miller", "Thompson", "Rodriguez", "Okafor", "Nguyen", "Schmidt", "Rossi", "Kowalski",
+    "Haddad", "Jensen", "Silva", "Dubois", "Tanaka", "Murphy", "Novak", "Ibrahim", "Larsen", "Costa"
+]
+CLUBS = ["Athletics Club", "City Harriers", "Throws Academy", "Track Elite", "University AC"]
+CATEGORIES = ["Junior", "U23", "Senior", "Elite", "Masters"]
+
+# Disciplines per sector: (name, best mark, higher is better, unit suffix)
+SECTORS = {
+    "Track & Field": [("100m", 10.9, False, ""), ("200m", 22.4, False, ""), ("Long Jump", 7.4, True, "m")],
+    "Field Events": [("Discus", 60.0, True, "m"), ("Shot Put", 18.5, True, "m"), ("Hammer", 65.0, True, "m")],
+    "Middle Distance": [("800m", 112.0, False, ""), ("1500m", 230.0, False, ""), ("3000m", 500.0, False, "")],
+}
+
+# Session archetypes: (title, type, minutes, typical intensity, tags)
+SESSION_KINDS = [
+    ("Speed Development", SessionType.SPEED, 90, 8, ["sprint", "acceleration"]),
+    ("Technique Session", SessionType.TECHNIQUE, 90, 6, ["technique"]),
+    ("Strength Training", SessionType.GYM, 75, 7, ["strength", "power"]),
+    ("Tempo Run", SessionType.ENDURANCE, 60, 5, ["tempo", "aerobic"]),
+    ("Recovery", SessionType.REST, 45, 2, ["recovery", "mobility"]),
+]
+
+PROGRAM_WEEKS = 12
+ASSESSMENT_EVERY_WEEKS = 6
+EVENTS_PER_YEAR = 12
+
+
+class BatchLoader:
+    """Buffers documents per collection and flushes them with insert_many.
+    
+    Counts what was actually inserted; documents insert_many rejected, e.g. on a
+    duplicate key, are counted per collection in failures with a sample error.
+    """
+    def __init__(self, batch_size: int, concurrency: int):
+        self.batch_size = batch_size
+        self.buffers: Dict[str, List[dict]] = {}
+        self.counts: Dict[str, int] = {}
+        self.failures: Dict[str, int] = {}
+        self.first_errors: Dict[str, str] = {}
+        self._slots = asyncio.Semaphore(concurrency)
+        self._pending = set()
+    
+    async def add(self, collection: str, document: dict):
+        buffer = self.buffers.setdefault(collection, [])
+        buffer.append(document)
+        if len(buffer) >= self.batch_size:
+            await self._flush(collection)
+    
+    async def _flush(self, collection: str):
+        documents = self.buffers.pop(collection, [])
+        if not documents:
+            return
+        
+        # Wait for a free slot, then let the insert run while generation continues
+        await self._slots.acquire()
+        task = asyncio.create_task(self._insert(collection, documents))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+    
+    async def _insert(self, collection: str, documents: List[dict]):
+        try:
+            errors = [error for error in await db_manager.create_documents(collection, documents) if error]
+            self.counts[collection] = self.counts.get(collection, 0) + len(documents) - len(errors)
+            if errors:
+                self.failures[collection] = self.failures.get(collection, 0) + len(errors)
+                self.first_errors.setdefault(collection, errors[0])
+        finally:
+            self._slots.release()
+    
+    async def close(self):
+        for collection in list(self.buffers):
+            await self._flush(collection)
+        await asyncio.gather(*self._pending)
+
+
+class DataGenerator:
+    """Builds a deterministic, production-shaped dataset from a seed."""
+    def __init__(self, loader: BatchLoader, athletes: int, years: float, sessions_per_week: int, seed: int):
+        self.loader = loader
+        self.athletes = athletes
+        self.sessions_per_week = min(sessions_per_week, 7)
+        self.rng = random.Random(seed)
+        self.now = datetime.utcnow().replace(microsecond=0)
+        self.start = self.now - timedelta(weeks=int(years * 52))
+        self.end = self.now + timedelta(weeks=2)  # a little scheduled work ahead
+        self.events = []
+    
+    def new_id(self) -> str:
+        """uuid4-shaped id drawn from the seeded generator, so runs are reproducible."""
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+    
+    async def generate(self):
+        await self.generate_events()
+        for _ in range(self.athletes):
+            await self.generate_athlete()
+    
+    async def generate_events(self):
+        count = max(int((self.end - self.start).days / 365 * EVENTS_PER_YEAR), 1)
+        for index in range(count):
+            event = {
+                "id": self.new_id(),
+                "name": f"{self.rng.choice(['Regional', 'National', 'Open', 'Indoor'])} Meet #{index + 1}",
+                "place": self.rng.choice(CLUBS),
+                "date": self.start + (self.end - self.start) * self.rng.random(),
+                "notes": None
+            }
+            self.events.append(event)
+            await self.loader.add(COLLECTIONS['events'], event)
+    
+    async def generate_athlete(self):
+        rng = self.rng
+        sector = rng.choice(list(SECTORS))
+        disciplines = rng.sample(SECTORS[sector], k=rng.randint(1, 2))
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        athlete = athlete_document(
+            first_name,
+            last_name,
+            doc_id=self.new_id(),
+            birth_date=datetime(rng.randint(1985, 2008), rng.randint(1, 12), rng.randint(1, 28)),
+            sex=rng.choice([Sex.FEMALE, Sex.MALE]).value,
+            height_cm=round(rng.gauss(178, 9), 1),
+            weight_kg=round(rng.gauss(72, 12), 1),
+            specialties=[name for name, _, _, _ in disciplines],
+            sector=sector,
+            category=rng.choice(CATEGORIES),
+            club=rng.choice(CLUBS),
+            health_status=rng.choice(["Excellent", "Good", "Recovering"]),
+            strengths=[],
+            weaknesses=[],
+            injuries=[],
+            allergies_limitations=[]
+        )
+        await self.loader.add(COLLECTIONS['athletes'], athlete)
+        
+        # Keyword arguments are evaluated in order, so the id is drawn before the priority
+        goal = goal_document(
+            doc_id=self.new_id(),
+            athlete_id=athlete['id'],
+            name=f"Improve {disciplines[0][0]}",
+            goal_type=GoalType.PERFORMANCE,
+            start_date=self.start,
+            end_date=self.end,
+            priority=rng.choice(list(Priority))
+        )
+        await self.loader.add(COLLECTIONS['goals'], goal)
+        
+        await self.generate_training(athlete, goal)
+        await self.generate_assessments(athlete)
+        await self.generate_results(athlete, disciplines)
+    
+    async def generate_training(self, athlete: dict, goal: dict):
+        """Consecutive programs of PROGRAM_WEEKS weeks, each with its weekly sessions."""
+        rng = self.rng
+        block_start = self.start
+        while block_start < self.end:
+            block_end = min(block_start + timedelta(weeks=PROGRAM_WEEKS), self.end)
+            program = program_document(
+                athlete['id'],
+                goal['id'],
+                f"{athlete['sector']} block {block_start:%Y-%m}",
+                block_start,
+                block_end,
+                self.sessions_per_week,
+                doc_id=self.new_id(),
+                status=(ProgramStatus.COMPLETED if block_end <= self.now else ProgramStatus.ACTIVE).value
+            )
+            await self.loader.add(COLLECTIONS['programs'], program)
+            
+            week_start = block_start
+            while week_start < block_end:
+                for day in sorted(rng.sample(range(7), self.sessions_per_week)):
+                    await self.loader.add(
+                        COLLECTIONS['sessions'],
+                        self.session(athlete, program, week_start + timedelta(days=day))
+                    )
+                week_start += timedelta(weeks=1)
+            block_start = block_end
+    
+    def session(self, athlete: dict, program: dict, day: datetime) -> dict:
+        rng = self.rng
+        title, session_type, minutes, intensity, tags = rng.choice(SESSION_KINDS)
+        start = day.replace(hour=rng.choice([7, 10, 16, 18]), minute=0, second=0)
+        session = session_document(
+            doc_id=self.new_id(),
+            program_id=program['id'],
+            athlete_id=athlete['id'],
+            title=title,
+            session_type=session_type,
+            start=start,
+            end=start + timedelta(minutes=minutes),
+            intensity=max(1, min(10, intensity + rng.randint(-1, 1))),
+            tags=tags
+        )
+        if start < self.now:
+            # Past sessions were mostly done, with logged effort and duration
+            if rng.random() < 0.08:
+                session["status"] = SessionStatus.CANCELED.value
+            else:
+                session["status"] = SessionStatus.DONE.value
+                session["rpe"] = max(1, min(10, session["intensity"] + rng.randint(-2, 1)))
+                session["duration_min"] = max(15, minutes + rng.randint(-15, 15))
+        return session
+    
+    async def generate_assessments(self, athlete: dict):
+        """Assessments every few weeks with slowly improving, noisy scores."""
+        rng = self.rng
+        levels = {metric: rng.uniform(3, 7) for metric in ASSESSMENT_METRICS}
+        date = self.start + timedelta(days=rng.randint(0, 13))
+        while date < self.now:
+            doc_id = self.new_id()
+            scores = {}
+            for metric in ASSESSMENT_METRICS:
+                levels[metric] = min(10, levels[metric] + rng.uniform(-0.2, 0.4))
+                scores[metric] = max(1, min(10, round(levels[metric] + rng.uniform(-0.5, 0.5))))
+            await self.loader.add(
+                COLLECTIONS['physical_assessments'],
+                assessment_document(athlete['id'], date, doc_id=doc_id, **scores)
+            )
+            date += timedelta(weeks=ASSESSMENT_EVERY_WEEKS)
+    
+    async def generate_results(self, athlete: dict, disciplines: list):
+        """Event entries for past events, with a personal record whenever the mark improves."""
+        rng = self.rng
+        bests = {name: None for name, _, _, _ in disciplines}
+        for event in sorted(self.events, key=lambda event: event['date']):
+            if event['date'] >= self.now or rng.random() > 0.4:
+                continue
+            
+            name, reference, higher_is_better, unit = rng.choice(disciplines)
+            mark = reference * rng.uniform(0.9, 1.0) if higher_is_better else reference * rng.uniform(1.0, 1.1)
+            best = bests[name]
+            is_pb = best is None or (mark > best if higher_is_better else mark < best)
+            value = f"{mark:.2f}{unit}"
+            await self.loader.add(COLLECTIONS['event_entries'], {
+                "id": self.new_id(),
+                "event_id": event['id'],
+                "athlete_id": athlete['id'],
+                "discipline": name,
+                "result_value": value,
+                "placing": rng.randint(1, 8),
+                "is_pb": is_pb
+            })
+            
+            if is_pb:
+                bests[name] = mark
+                await self.loader.add(
+                    COLLECTIONS['personal_records'],
+                    record_document(athlete['id'], name, value, event['date'], doc_id=self.new_id(), notes=event['name'])
+                )
+
+
+async def generate_data(
+    athletes: int,
+    years: float,
+    sessions_per_week: int,
+    seed: int,
+    batch_size: int = 5000,
+    concurrency: int = 4
+) -> Dict[str, int]:
+    """Generate and bulk-load a synthetic dataset, then rebuild the weekly rollups.
+    
+    Returns the documents inserted per collection; failed inserts are reported, not counted.
+    """
+    loader = BatchLoader(batch_size, concurrency)
+    generator = DataGenerator(loader, athletes, years, sessions_per_week, seed)
+    await generator.generate()
+    await loader.close()
+    
+    counts = dict(loader.counts)
+    counts[COLLECTIONS['weekly_rollups']] = await rebuild_rollups()
+    for collection, failed in sorted(loader.failures.items()):
+        print(f"⚠️  {collection}: {failed} document(s) failed to insert, e.g. {loader.first_errors[collection]}")
+    return counts
+
+
+async def _generate(args):
+    started = time.perf_counter()
+    counts = await generate_data(
+        args.athletes, args.years, args.sessions_per_week, args.seed, args.batch_size, args.concurrency
+    )
+    elapsed = time.perf_counter() - started
+    
+    total = sum(counts.values())
+    for collection, count in sorted(counts.items()):
+        print(f"✅ {collection}: {count}")
+    print(f"🎉 Inserted {total} documents in {elapsed:.1f}s ({total / elapsed * 60:,.0f} docs/min)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load a large synthetic dataset for scaling tests.")
+    parser.add_argument("--athletes", type=int, default=100, help="number of athletes")
+    parser.add_argument("--years", type=float, default=2, help="years of training history per athlete")
+    parser.add_argument("--sessions-per-week", type=int, default=5, help="sessions per athlete per week (max 7)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed; the same seed yields the same data")
+    parser.add_argument("--batch-size", type=int, default=5000, help="documents per insert_many call")
+    parser.add_argument("--concurrency", type=int, default=4, help="insert_many calls in flight at once")
+    args = parser.parse_args()
+    asyncio.run(_generate(args))
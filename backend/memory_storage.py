@@ -0,0 +1,583 @@
+import re
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymongo.errors import DuplicateKeyError
+
+from storage import Increment, Sort, index_name
+
+# Fields with a secondary hash index in every collection, besides the unique "id"
+SECONDARY_INDEX_FIELDS = ("athlete_id",)
+
+_MISSING = object()
+
+
+def _clone(value):
+    """Copy the containers of a document so callers never share state with the store.
+    
+    Datetimes are truncated to milliseconds, the precision BSON stores, so values
+    round-trip through pagination cursors exactly as they do with MongoDB.
+    """
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    if isinstance(value, datetime):
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+
+def _get(document: dict, path: str):
+    """Value at a dotted path, or _MISSING."""
+    value = document
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set(document: dict, path: str, value):
+    *parents, last = path.split(".")
+    for part in parents:
+        document = document.setdefault(part, {})
+    document[last] = value
+
+
+def _type_rank(value) -> int:
+    """BSON comparison order of the types stored by this app."""
+    if value is None or value is _MISSING:
+        return 0
+    if isinstance(value, bool):
+        return 5
+    if isinstance(value, (int, float)):
+        return 1
+    if isinstance(value, str):
+        return 2
+    if isinstance(value, dict):
+        return 3
+    if isinstance(value, list):
+        return 4
+    if isinstance(value, datetime):
+        return 6
+    return 7
+
+
+def _sort_key(value):
+    rank = _type_rank(value)
+    if rank in (0, 3, 4, 7):
+        return rank, 0 if rank == 0 else str(value)
+    return rank, value
+
+
+def _freeze(value):
+    """Hashable form of a group key."""
+    if isinstance(value, dict):
+        return tuple((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _compare(value, operator: str, operand) -> bool:
+    # Like MongoDB, range operators only match values of the same type
+    if value is _MISSING or _type_rank(value) != _type_rank(operand) or value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    return value <= operand
+
+
+def _equals(value, operand) -> bool:
+    if operand is None:
+        return value is None or value is _MISSING
+    if isinstance(value, list) and not isinstance(operand, list):
+        return operand in value
+    return value == operand
+
+
+def _match_operator(value, operator: str, operand) -> bool:
+    if operator == "$eq":
+        return _equals(value, operand)
+    if operator == "$ne":
+        return not _equals(value, operand)
+    if operator == "$in":
+        return any(_equals(value, item) for item in operand)
+    if operator == "$nin":
+        return not any(_equals(value, item) for item in operand)
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if operator in ("$gt", "$gte", "$lt", "$lte"):
+        values = value if isinstance(value, list) else [value]
+        return any(_compare(item, operator, operand) for item in values)
+    if operator == "$regex":
+        pattern = re.compile(operand) if isinstance(operand, str) else operand
+        values = value if isinstance(value, list) else [value]
+        return any(isinstance(item, str) and pattern.search(item) for item in values)
+    raise NotImplementedError(f"Query operator {operator} is not supported by the memory backend")
+
+
+def matches(document: dict, query: dict) -> bool:
+    """Evaluate a MongoDB query against a document."""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, clause) for clause in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, clause) for clause in condition):
+                return False
+        else:
+            value = _get(document, key)
+            if isinstance(condition, dict) and condition and all(op.startswith("$") for op in condition):
+                if not all(_match_operator(value, op, operand) for op, operand in condition.items()):
+                    return False
+            elif not _equals(value, condition):
+                return False
+    return True
+
+
+def _lookup_values(query: dict, field: str) -> Optional[List[Any]]:
+    """Values a query pins an indexed field to, or None when it does not."""
+    condition = query.get(field, _MISSING)
+    if condition is not _MISSING:
+        if isinstance(condition, dict):
+            if set(condition) == {"$in"}:
+                return list(condition["$in"])
+            if set(condition) == {"$eq"}:
+                return [condition["$eq"]]
+        elif not isinstance(condition, list) and condition is not None:
+            return [condition]
+    for clause in query.get("$and", []):
+        values = _lookup_values(clause, field)
+        if values is not None:
+            return values
+    return None
+
+
+def _project(document: dict, fields: Optional[List[str]]) -> dict:
+    if not fields:
+        return _clone(document)
+    return {field: _clone(document[field]) for field in fields if field in document}
+
+
+def _sorted(documents: List[dict], sort: Optional[Sort]) -> List[dict]:
+    for field, direction in reversed(sort or []):
+        documents.sort(key=lambda document: _sort_key(_get(document, field)), reverse=direction < 0)
+    return documents
+
+
+def evaluate(expression, document: dict):
+    """Evaluate the aggregation expressions used by the analytics pipelines."""
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get(document, expression[1:])
+        return None if value is _MISSING else value
+    if isinstance(expression, list):
+        return [evaluate(item, document) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) != 1 or not next(iter(expression)).startswith("$"):
+        return {key: evaluate(value, document) for key, value in expression.items()}
+    
+    operator, operand = next(iter(expression.items()))
+    if operator == "$ifNull":
+        for item in operand:
+            value = evaluate(item, document)
+            if value is not None:
+                return value
+        return None
+    if operator == "$dateToString":
+        date = evaluate(operand["date"], document)
+        return None if date is None else date.strftime(operand.get("format", "%Y-%m-%dT%H:%M:%S.%LZ").replace("%L", f"{date.microsecond // 1000:03d}"))
+    
+    values = [evaluate(item, document) for item in operand]
+    if any(value is None for value in values):
+        return None
+    if operator == "$add":
+        return sum(values[1:], values[0])
+    if operator == "$multiply":
+        result = 1
+        for value in values:
+            result *= value
+        return result
+    if operator == "$divide":
+        return values[0] / values[1]
+    if operator == "$subtract":
+        left, right = values
+        if isinstance(left, datetime) and isinstance(right, datetime):
+            return int((left - right) / timedelta(milliseconds=1))
+        if isinstance(left, datetime):
+            return left - timedelta(milliseconds=right)
+        return left - right
+    raise NotImplementedError(f"Expression {operator} is not supported by the memory backend")
+
+
+def _accumulate(rows: List[dict], accumulator: dict):
+    (operator, expression), = accumulator.items()
+    values = [evaluate(expression, row) for row in rows]
+    if operator == "$sum":
+        return sum(value for value in values if isinstance(value, (int, float)) and not isinstance(value, bool))
+    present = [value for value in values if value is not None]
+    if operator == "$avg":
+        numbers = [value for value in present if isinstance(value, (int, float))]
+        return sum(numbers) / len(numbers) if numbers else None
+    if operator == "$min":
+        return min(present, key=_sort_key, default=None)
+    if operator == "$max":
+        return max(present, key=_sort_key, default=None)
+    if operator == "$first":
+        return values[0] if values else None
+    if operator == "$last":
+        return values[-1] if values else None
+    if operator == "$push":
+        return values
+    raise NotImplementedError(f"Accumulator {operator} is not supported by the memory backend")
+
+
+def _group(rows: List[dict], spec: dict) -> List[dict]:
+    groups: Dict[Any, Tuple[Any, List[dict]]] = {}
+    for row in rows:
+        key = evaluate(spec["_id"], row)
+        groups.setdefault(_freeze(key), (key, []))[1].append(row)
+    return [
+        {"_id": key, **{field: _accumulate(members, accumulator) for field, accumulator in spec.items() if field != "_id"}}
+        for key, members in groups.values()
+    ]
+
+
+def _project_stage(rows: List[dict], spec: dict) -> List[dict]:
+    exclusions = [field for field, value in spec.items() if value in (0, False)]
+    if len(exclusions) == len(spec):
+        return [{key: value for key, value in row.items() if key not in exclusions} for row in rows]
+    
+    projected = []
+    for row in rows:
+        result = {} if spec.get("_id", 1) in (0, False) or "_id" not in row else {"_id": row["_id"]}
+        for field, value in spec.items():
+            if value in (0, False):
+                continue
+            if value in (1, True):
+                found = _get(row, field)
+                if found is not _MISSING:
+                    result[field] = found
+            else:
+                result[field] = evaluate(value, row)
+        projected.append(result)
+    return projected
+
+
+class MemoryBackend:
+    """In-process storage engine for tests, benchmarks and single-coach deployments.
+    
+    Each collection keeps its documents in insertion order with a hash index on
+    "id" and on SECONDARY_INDEX_FIELDS; queries pinning one of those fields to
+    values only visit the matching documents, everything else is a scan. Unique
+    INDEXES are enforced and TTL indexes purge expired documents on insert.
+    Data lives only as long as the process.
+    """
+    def __init__(self):
+        self._documents: Dict[str, Dict[int, dict]] = {}
+        self._by_id: Dict[str, Dict[Any, int]] = {}
+        self._secondary: Dict[str, Dict[str, Dict[Any, Set[int]]]] = {}
+        self._unique: Dict[str, Dict[str, Tuple[List[str], Dict[Any, int]]]] = {}
+        self._ttl: Dict[str, List[Tuple[str, int]]] = {}
+        self._index_names: Dict[str, List[str]] = {}
+        self._next_key = 0
+    
+    def _collection(self, collection: str) -> Dict[int, dict]:
+        if collection not in self._documents:
+            self._documents[collection] = {}
+            self._by_id[collection] = {}
+            self._secondary[collection] = {field: {} for field in SECONDARY_INDEX_FIELDS}
+            self._unique.setdefault(collection, {})
+        return self._documents[collection]
+    
+    def _candidates(self, collection: str, query: dict) -> Iterable[int]:
+        documents = self._collection(collection)
+        ids = _lookup_values(query, "id")
+        if ids is not None:
+            by_id = self._by_id[collection]
+            return sorted({by_id[doc_id] for doc_id in ids if doc_id in by_id})
+        for field in SECONDARY_INDEX_FIELDS:
+            values = _lookup_values(query, field)
+            if values is not None:
+                index = self._secondary[collection][field]
+                return sorted(set().union(*(index.get(value, set()) for value in values)))
+        return list(documents)
+    
+    def _matching(self, collection: str, query: dict) -> List[Tuple[int, dict]]:
+        documents = self._collection(collection)
+        return [
+            (key, documents[key])
+            for key in self._candidates(collection, query)
+            if matches(documents[key], query)
+        ]
+    
+    def _unique_keys(self, collection: str, document: dict) -> List[Tuple[str, Any]]:
+        keys = []
+        if "id" in document:
+            keys.append(("id_1", document["id"]))
+        for name, (fields, _) in self._unique[collection].items():
+            if name != "id_1":
+                keys.append((name, tuple(document.get(field) for field in fields)))
+        return keys
+    
+    def _check_unique(self, collection: str, document: dict, key: Optional[int] = None):
+        for name, value in self._unique_keys(collection, document):
+            index = self._by_id[collection] if name == "id_1" else self._unique[collection][name][1]
+            owner = index.get(value)
+            if owner is not None and owner != key:
+                raise DuplicateKeyError(
+                    f"E11000 duplicate key error collection: {collection} index: {name} dup key: {value!r}",
+                    11000
+                )
+    
+    def _index(self, collection: str, key: int, document: dict):
+        for name, value in self._unique_keys(collection, document):
+            index = self._by_id[collection] if name == "id_1" else self._unique[collection][name][1]
+            index[value] = key
+        for field, index in self._secondary[collection].items():
+            if field in document:
+                index.setdefault(document[field], set()).add(key)
+    
+    def _unindex(self, collection: str, key: int, document: dict):
+        for name, value in self._unique_keys(collection, document):
+            index = self._by_id[collection] if name == "id_1" else self._unique[collection][name][1]
+            if index.get(value) == key:
+                del index[value]
+        for field, index in self._secondary[collection].items():
+            if field in document:
+                index.get(document[field], set()).discard(key)
+    
+    def _store(self, collection: str, document: dict):
+        documents = self._collection(collection)
+        self._purge_expired(collection)
+        document = _clone(document)
+        document.pop('_id', None)
+        self._check_unique(collection, document)
+        key = self._next_key
+        self._next_key += 1
+        documents[key] = document
+        self._index(collection, key, document)
+    
+    def _replace(self, collection: str, key: int, document: dict):
+        self._check_unique(collection, document, key)
+        self._unindex(collection, key, self._documents[collection][key])
+        self._documents[collection][key] = document
+        self._index(collection, key, document)
+    
+    def _remove(self, collection: str, key: int) -> dict:
+        document = self._documents[collection].pop(key)
+        self._unindex(collection, key, document)
+        return document
+    
+    def _purge_expired(self, collection: str):
+        for field, seconds in self._ttl.get(collection, []):
+            cutoff = datetime.utcnow() - timedelta(seconds=seconds)
+            expired = [
+                key for key, document in self._documents[collection].items()
+                if isinstance(document.get(field), datetime) and document[field] <= cutoff
+            ]
+            for key in expired:
+                self._remove(collection, key)
+    
+    async def insert_one(self, collection: str, document: dict):
+        self._store(collection, document)
+    
+    async def insert_many(self, collection: str, documents: List[dict]) -> List[Optional[str]]:
+        errors = [None] * len(documents)
+        for i, document in enumerate(documents):
+            try:
+                self._store(collection, document)
+            except DuplicateKeyError as e:
+                errors[i] = str(e)
+        return errors
+    
+    async def bulk_write(self, collection: str, creates: List[dict], updates: List[Tuple[str, dict]]) -> List[Optional[str]]:
+        errors = await self.insert_many(collection, creates)
+        for doc_id, update_data in updates:
+            try:
+                found = await self.update_one(collection, doc_id, update_data, ["id"])
+                errors.append(None if found else "Document not found")
+            except DuplicateKeyError as e:
+                errors.append(str(e))
+        return errors
+    
+    async def find_one(self, collection: str, query: dict, fields: Optional[List[str]] = None) -> Optional[dict]:
+        documents = self._collection(collection)
+        for key in self._candidates(collection, query):
+            if matches(documents[key], query):
+                return _project(documents[key], fields)
+        return None
+    
+    async def find(
+        self,
+        collection: str,
+        query: dict,
+        fields: Optional[List[str]] = None,
+        sort: Optional[Sort] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        documents = _sorted([document for _, document in self._matching(collection, query)], sort)
+        if limit:
+            documents = documents[:limit]
+        return [_project(document, fields) for document in documents]
+    
+    def iterate(
+        self,
+        collection: str,
+        query: dict,
+        fields: Optional[List[str]],
+        sort: Sort,
+        limit: Optional[int],
+        batch_size: int
+    ) -> AsyncIterator[dict]:
+        return self._iterate(collection, query, fields, sort, limit)
+    
+    async def _iterate(self, collection: str, query: dict, fields, sort, limit) -> AsyncIterator[dict]:
+        for document in await self.find(collection, query, fields, sort, limit):
+            yield document
+    
+    async def update_one(
+        self,
+        collection: str,
+        doc_id: str,
+        update_data: dict,
+        fields: Optional[List[str]] = None,
+        return_previous: bool = False
+    ) -> Optional[dict]:
+        self._collection(collection)
+        key = self._by_id[collection].get(doc_id)
+        if key is None:
+            return None
+        
+        previous = self._documents[collection][key]
+        document = _clone(previous)
+        for path, value in update_data.items():
+            _set(document, path, _clone(value))
+        self._replace(collection, key, document)
+        return _project(previous if return_previous else document, fields)
+    
+    async def upsert_increments(self, collection: str, increments: List[Increment]):
+        for query, inc, fields, defaults in increments:
+            found = self._matching(collection, query)
+            if found:
+                key, previous = found[0]
+                document = _clone(previous)
+            else:
+                key = None
+                document = {field: _clone(value) for field, value in query.items() if not field.startswith("$") and not isinstance(value, dict)}
+                document.update(_clone(defaults))
+            
+            for path, amount in inc.items():
+                current = _get(document, path)
+                _set(document, path, amount if current is _MISSING else current + amount)
+            for path, value in fields.items():
+                _set(document, path, _clone(value))
+            
+            if key is None:
+                self._store(collection, document)
+            else:
+                self._replace(collection, key, document)
+    
+    async def delete_one(self, collection: str, doc_id: str) -> bool:
+        return await self.pop_one(collection, doc_id) is not None
+    
+    async def pop_one(self, collection: str, doc_id: str) -> Optional[dict]:
+        self._collection(collection)
+        key = self._by_id[collection].get(doc_id)
+        if key is None:
+            return None
+        return self._remove(collection, key)
+    
+    async def delete_many(self, collection: str, query: dict) -> int:
+        found = self._matching(collection, query)
+        for key, _ in found:
+            self._remove(collection, key)
+        return len(found)
+    
+    async def count(self, collection: str, query: dict) -> int:
+        return len(self._matching(collection, query))
+    
+    async def estimate_count(self, collection: str, query: Optional[dict]) -> int:
+        if not query:
+            return len(self._collection(collection))
+        return await self.count(collection, query)
+    
+    async def aggregate(self, collection: str, pipeline: List[dict], limit: Optional[int]) -> List[dict]:
+        """Aggregate-lite: $match (index-assisted when first), $group, $project, $sort, $skip and $limit."""
+        stages = list(pipeline)
+        if stages and "$match" in stages[0]:
+            rows = [document for _, document in self._matching(collection, stages.pop(0)["$match"])]
+        else:
+            rows = list(self._collection(collection).values())
+        
+        for stage in stages:
+            (operator, spec), = stage.items()
+            if operator == "$match":
+                rows = [row for row in rows if matches(row, spec)]
+            elif operator == "$group":
+                rows = _group(rows, spec)
+            elif operator == "$project":
+                rows = _project_stage(rows, spec)
+            elif operator == "$sort":
+                rows = _sorted(list(rows), list(spec.items()))
+            elif operator == "$skip":
+                rows = rows[spec:]
+            elif operator == "$limit":
+                rows = rows[:spec]
+            else:
+                raise NotImplementedError(f"Pipeline stage {operator} is not supported by the memory backend")
+        
+        if limit:
+            rows = rows[:limit]
+        return [{key: _clone(value) for key, value in row.items() if key != '_id'} for row in rows]
+    
+    async def create_indexes(self, collection: str, specs: List[dict]) -> List[str]:
+        self._collection(collection)
+        names = []
+        for spec in specs:
+            name = index_name(spec)
+            options = spec.get('options', {})
+            if options.get('unique') and name != "id_1" and name not in self._unique[collection]:
+                fields = [field for field, _ in spec['keys']]
+                index = {}
+                for key, document in self._documents[collection].items():
+                    index[tuple(document.get(field) for field in fields)] = key
+                self._unique[collection][name] = (fields, index)
+            if 'expireAfterSeconds' in options:
+                ttl = (spec['keys'][0][0], options['expireAfterSeconds'])
+                if ttl not in self._ttl.setdefault(collection, []):
+                    self._ttl[collection].append(ttl)
+            if name not in self._index_names.setdefault(collection, []):
+                self._index_names[collection].append(name)
+            names.append(name)
+        return names
+    
+    async def index_names(self, collection: str) -> List[str]:
+        return ["_id_", *self._index_names.get(collection, [])]
+    
+    def _scan_plan(self, query: dict) -> dict:
+        """The access path _candidates takes for a query."""
+        for field in ("id", *SECONDARY_INDEX_FIELDS):
+            if _lookup_values(query, field) is not None:
+                return {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": f"{field}_1"}}
+        return {"stage": "COLLSCAN"}
+    
+    async def explain_find(self, collection: str, query: dict, sort: Optional[Sort], limit: Optional[int]) -> dict:
+        plan = self._scan_plan(query)
+        if sort:
+            plan = {"stage": "SORT", "inputStage": plan}
+        if limit:
+            plan = {"stage": "LIMIT", "inputStage": plan}
+        return {"queryPlanner": {"namespace": collection, "winningPlan": plan}}
+    
+    async def explain_aggregate(self, collection: str, pipeline: List[dict]) -> dict:
+        query = pipeline[0]["$match"] if pipeline and "$match" in pipeline[0] else {}
+        return {"queryPlanner": {"namespace": collection, "winningPlan": self._scan_plan(query)}}
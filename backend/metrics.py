@@ -0,0 +1,244 @@
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, Iterable, Tuple
+
+from pymongo import monitoring
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Seconds between event loop lag probes
+EVENT_LOOP_PROBE_INTERVAL = 0.5
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Metrics are only updated from the event loop thread, so they take no locks
+class Counter:
+    type = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+    
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.type}"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_number(value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+    
+    def set(self, labels: Tuple[str, ...], value: float):
+        self._values[labels] = value
+    
+    def dec(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        self.inc(labels, -amount)
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, labels: Tuple[str, ...], value: float):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+    
+    def expose(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, f'le="{le}"')
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_number(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+    
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        for collect in self.collectors:
+            collect()
+        lines = [line for metric in self.metrics for line in metric.expose()]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template and status code.",
+    ("method", "route", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."
+))
+db_operation_duration = registry.register(Histogram(
+    "db_operation_duration_seconds", "DatabaseManager call latency by collection and operation.",
+    ("collection", "operation")
+))
+db_operation_errors = registry.register(Counter(
+    "db_operation_errors_total", "DatabaseManager calls that raised, by collection and operation.",
+    ("collection", "operation")
+))
+pool_checkout_wait = registry.register(Histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting to check a connection out of the MongoDB pool."
+))
+pool_checkout_failures = registry.register(Counter(
+    "mongo_pool_checkout_failures_total", "Failed MongoDB connection checkouts by reason.", ("reason",)
+))
+event_loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop ran a timer that should have fired on time.",
+    buckets=LAG_BUCKETS
+))
+
+
+def observe_db_call(operation: str, collection: str, duration: float, failed: bool):
+    """DatabaseManager listener."""
+    labels = (collection, operation)
+    db_operation_duration.observe(labels, duration)
+    if failed:
+        db_operation_errors.inc(labels)
+
+
+class PoolCheckoutListener(monitoring.ConnectionPoolListener):
+    """Measures connection checkout waits. pymongo calls it from Motor's worker
+    threads, so observations are queued on a deque, whose append is thread-safe,
+    and folded into the metrics by collect() at scrape time."""
+    def __init__(self):
+        self._started = threading.local()
+        self._events = deque(maxlen=100000)
+    
+    def connection_check_out_started(self, event):
+        self._started.at = time.perf_counter()
+    
+    def connection_checked_out(self, event):
+        started = getattr(self._started, "at", None)
+        if started is not None:
+            self._events.append((None, time.perf_counter() - started))
+            self._started.at = None
+    
+    def connection_check_out_failed(self, event):
+        self._events.append((str(event.reason), None))
+        self._started.at = None
+    
+    def collect(self):
+        while self._events:
+            reason, wait = self._events.popleft()
+            if reason is None:
+                pool_checkout_wait.observe((), wait)
+            else:
+                pool_checkout_failures.inc((reason,))
+    
+    # Remaining pool events are not measured
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        pass
+    
+    def connection_checked_in(self, event):
+        pass
+
+pool_listener = PoolCheckoutListener()
+registry.collectors.append(pool_listener.collect)
+
+
+async def monitor_event_loop(interval: float = EVENT_LOOP_PROBE_INTERVAL):
+    """Measure how late a sleep wakes up; run as a background task."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        event_loop_lag.observe((), max(loop.time() - started - interval, 0.0))
+
+
+class MetricsMiddleware:
+    """Records latency per route template and status, and the number of requests in flight."""
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            # Templates, not raw paths, keep the label set bounded
+            route = scope.get("route")
+            template = route.path if route is not None else "unmatched"
+            http_request_duration.observe(
+                (scope["method"], template, str(status_code)),
+                time.perf_counter() - started
+            )
@@ -139,6 +139,14 @@ class AthleteCreate(BaseModel):
     injuries: List[Injury] = []
     allergies_limitations: List[str] = []
 
+class AthleteSearchResult(BaseModel):
+    id: str
+    first_name: str
+    last_name: str
+    sector: Optional[str] = None
+    photo_url: Optional[str] = None
+    score: float
+
 class AthleteUpdate(BaseModel):
     first_name: Optional[str] = None
     last_name: Optional[str] = None
@@ -174,6 +182,12 @@ class PersonalRecordCreate(BaseModel):
     date: datetime
     notes: Optional[str] = None
 
+class PersonalRecordUpdate(BaseModel):
+    discipline: Optional[str] = None
+    value: Optional[str] = None
+    date: Optional[datetime] = None
+    notes: Optional[str] = None
+
 # Goal Models
 class Goal(BaseDBModel):
     athlete_id: str
@@ -406,6 +420,48 @@ class SessionTemplateCreate(BaseModel):
     tags: List[str] = []
     exercises: List[Dict[str, Any]] = []
 
+# Bulk Models
+MAX_BULK_ITEMS = 1000
+
+class SessionBulkUpdate(SessionUpdate):
+    id: str
+
+class SessionStatusChange(BaseModel):
+    id: str
+    status: SessionStatus
+
+class SessionBulkRequest(BaseModel):
+    create: List[SessionCreate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    update: List[SessionBulkUpdate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    status: List[SessionStatusChange] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+
+class PhysicalAssessmentBulkUpdate(PhysicalAssessmentCreate):
+    id: str
+
+class PhysicalAssessmentBulkRequest(BaseModel):
+    create: List[PhysicalAssessmentCreate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    update: List[PhysicalAssessmentBulkUpdate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+
+class PersonalRecordBulkUpdate(PersonalRecordUpdate):
+    id: str
+
+class PersonalRecordBulkRequest(BaseModel):
+    create: List[PersonalRecordCreate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+    update: List[PersonalRecordBulkUpdate] = Field(default_factory=list, max_length=MAX_BULK_ITEMS)
+
+class BulkItemResult(BaseModel):
+    op: str  # create, update or status
+    index: int  # position within the request array for that op
+    id: str
+    ok: bool
+    error: Optional[str] = None
+
+class BulkResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkItemResult]
+
 # Authentication Models
 class Token(BaseModel):
     access_token: str
@@ -415,6 +471,7 @@ class TokenData(BaseModel):
     user_id: Optional[str] = None
     email: Optional[str] = None
     role: Optional[UserRole] = None
+    jti: Optional[str] = None
 
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -422,11 +479,57 @@ class LoginRequest(BaseModel):
 
 # Analytics Models
 class AthleteOverview(BaseModel):
-    weekly_volume: int
+    window_days: int = 7
+    weekly_volume: int  # sessions done within the window
     intensity_avg: float
     sessions_count_by_type: Dict[str, int]
     next_events: List[Event]
 
+class WeeklyRollup(BaseModel):
+    athlete_id: str
+    iso_week: str  # e.g. 2024-W05
+    week_start: datetime
+    sessions_count: int = 0
+    count_by_type: Dict[str, int] = {}
+    intensity_sum: int = 0
+    intensity_count: int = 0
+    intensity_avg: float = 0
+    load: int = 0  # sum of RPE x duration (session-RPE load)
+    minutes: int = 0
+
+class LoadSummary(BaseModel):
+    athlete_id: str
+    date: str
+    daily_load: float
+    acute_load: float
+    chronic_load: float
+    acwr: Optional[float] = None
+    monotony: Optional[float] = None
+    strain: Optional[float] = None
+
+class AthleteLoad(BaseModel):
+    athlete_id: str
+    dates: List[str]
+    daily_load: List[float]
+    acute_load: List[float]
+    chronic_load: List[float]
+    acwr: List[Optional[float]]
+    monotony: List[Optional[float]]
+    strain: List[Optional[float]]
+    latest: LoadSummary
+
+class MetricStats(BaseModel):
+    rolling_mean: Optional[List[Optional[float]]] = None
+    delta: Optional[List[Optional[float]]] = None
+    slope_per_30d: Optional[float] = None
+
+class RosterOverviewEntry(BaseModel):
+    athlete_id: str
+    first_name: str
+    last_name: str
+    sector: Optional[str] = None
+    overview: AthleteOverview
+
 class AssessmentSeries(BaseModel):
     dates: List[str]
     strength_max: List[Optional[int]]
@@ -438,4 +541,5 @@ class AssessmentSeries(BaseModel):
     mobility: List[Optional[int]]
     endurance_aerobic: List[Optional[int]]
     endurance_lactate: List[Optional[int]]
-    icm: List[Optional[int]]
\ No newline at end of file
+    icm: List[Optional[int]]
+    stats: Optional[Dict[str, MetricStats]] = None
\ No newline at end of file
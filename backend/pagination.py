@@ -0,0 +1,93 @@
+import base64
+from datetime import datetime
+from typing import Any, List, Optional
+
+from bson import ObjectId, json_util
+from fastapi import Query
+
+# Page sizes for list endpoints
+DEFAULT_PAGE_SIZE = 1000
+MAX_PAGE_SIZE = 1000
+
+# Documents fetched per round trip when streaming a list endpoint
+STREAM_BATCH_SIZE = 500
+
+_CURSOR_JSON_OPTIONS = json_util.JSONOptions(tz_aware=False)
+
+# Types a sort-key value in a cursor may have
+_CURSOR_VALUE_TYPES = (str, int, float, bool, datetime, ObjectId, type(None))
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort-key values of the last returned document as an opaque token."""
+    raw = json_util.dumps(values, json_options=_CURSOR_JSON_OPTIONS).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, size: int) -> List[Any]:
+    """Decode a token produced by encode_cursor for `size` sort keys."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json_util.loads(raw, json_options=_CURSOR_JSON_OPTIONS)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor")
+    if not all(isinstance(value, _CURSOR_VALUE_TYPES) for value in values):
+        raise InvalidCursor("Invalid cursor")
+    return values
+
+
+def keyset_query(query: dict, sort_keys: List[str], after: List[Any]) -> dict:
+    """Restrict a query to documents that sort strictly after the given key values."""
+    if len(after) != len(sort_keys):
+        raise InvalidCursor("Invalid cursor")
+    
+    clauses = []
+    for i, key in enumerate(sort_keys):
+        clause = {sort_keys[j]: after[j] for j in range(i)}
+        clause[key] = {"$gt": after[i]}
+        clauses.append(clause)
+    
+    keyset = {"$or": clauses}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+class PageParams:
+    """Query parameters shared by every list endpoint."""
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = False,
+        fields: Optional[str] = None
+    ):
+        self.limit = limit or DEFAULT_PAGE_SIZE
+        # Streamed responses are only capped when the client asks for it
+        self.stream_limit = limit
+        self.cursor = cursor
+        self.include_total = include_total
+        self.fields = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+
+
+async def page_params(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated list of fields to return")
+) -> PageParams:
+    """PageParams dependency; async so FastAPI resolves it without a threadpool hop."""
+    return PageParams(limit, cursor, include_total, fields)
+
+
+async def cursor_page_params(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False
+) -> PageParams:
+    """PageParams dependency for endpoints whose response shape is fixed, so no field selection."""
+    return PageParams(limit, cursor, include_total)
@@ -0,0 +1,186 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional
+
+import fastapi.dependencies.utils
+import fastapi.routing
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+# Share of requests that are profiled; each profiled request costs a few perf_counter calls per phase
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0.01"))
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Self time per phase of one request, plus database calls per collection.
+    
+    Phases nest: time spent in an inner phase or database call is subtracted
+    from the phase around it, so the phases add up to at most the total.
+    """
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.db: Dict[str, List] = {}
+        self._child_time = [0.0]
+    
+    def enter(self):
+        self._child_time.append(0.0)
+    
+    def exit(self, name: str, elapsed: float):
+        children = self._child_time.pop()
+        self.phases[name] = self.phases.get(name, 0.0) + elapsed - children
+        self._child_time[-1] += elapsed
+    
+    def record_db(self, collection: str, duration: float):
+        calls = self.db.setdefault(collection, [0, 0.0])
+        calls[0] += 1
+        calls[1] += duration
+        self._child_time[-1] += duration
+    
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+    
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds."""
+        entries = [f"total;dur={self.elapsed() * 1000:.2f}"]
+        if self.db:
+            db_time = sum(duration for _, duration in self.db.values())
+            calls = sum(count for count, _ in self.db.values())
+            entries.append(f'db;dur={db_time * 1000:.2f};desc="{calls} calls"')
+            for collection, (count, duration) in self.db.items():
+                entries.append(f'db-{collection};dur={duration * 1000:.2f};desc="{count} calls"')
+        for name, seconds in self.phases.items():
+            entries.append(f"{name};dur={seconds * 1000:.2f}")
+        return ", ".join(entries)
+    
+    def record(self) -> dict:
+        """Structured form for the log line."""
+        return {
+            "total_ms": round(self.elapsed() * 1000, 2),
+            "phases_ms": {name: round(seconds * 1000, 2) for name, seconds in self.phases.items()},
+            "db": {
+                collection: {"calls": count, "ms": round(duration * 1000, 2)}
+                for collection, (count, duration) in self.db.items()
+            }
+        }
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the time spent in the block to a phase of the current request, if it is profiled."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    
+    profile.enter()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.exit(name, time.perf_counter() - started)
+
+
+def record_db_call(operation: str, collection: str, duration: float, failed: bool):
+    """DatabaseManager listener feeding the current request profile."""
+    profile = _current.get()
+    if profile is not None:
+        profile.record_db(collection, duration)
+
+
+def _profiled_endpoint(endpoint: Callable, name: str = "app") -> Callable:
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        with phase(name):
+            return await endpoint(*args, **kwargs)
+    return wrapper
+
+
+def _profiled_function(function: Callable, name: str) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with phase(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+def _instrument_fastapi():
+    """Time FastAPI's model validation steps as phases of their own.
+    
+    FastAPI looks these functions up as module globals on every request, so
+    wrapping them once covers every route; outside profiled requests the
+    wrappers only check the context variable.
+    """
+    utils = fastapi.dependencies.utils
+    if getattr(utils.request_body_to_args, "__wrapped__", None) is not None:
+        return
+    utils.request_params_to_args = _profiled_function(utils.request_params_to_args, "validation")
+    utils.request_body_to_args = _profiled_endpoint(utils.request_body_to_args, "validation")
+    fastapi.routing.serialize_response = _profiled_endpoint(fastapi.routing.serialize_response, "serialization")
+
+
+_instrument_fastapi()
+
+
+class ProfiledRoute(APIRoute):
+    """Route that splits a profiled request into phases: the endpoint body ("app"),
+    validation of parameters and the request body ("validation"), response_model
+    validation and encoding ("serialization"), and everything else FastAPI does
+    ("framework"), such as reading the body and solving dependencies."""
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if asyncio.iscoroutinefunction(endpoint):
+            endpoint = _profiled_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+    
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        
+        async def profiled_handler(request):
+            with phase("framework"):
+                return await handler(request)
+        return profiled_handler
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of requests, reporting them in a Server-Timing header and a JSON log line."""
+    def __init__(self, app, sample_rate: float = PROFILING_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+        
+        profile = RequestProfile()
+        token = _current.set(profile)
+        status_code = None
+        
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            logger.info(json.dumps({
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                **profile.record()
+            }))
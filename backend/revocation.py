@@ -0,0 +1,73 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional, Set
+
+from pymongo.errors import DuplicateKeyError
+
+from database import db_manager, COLLECTIONS
+
+logger = logging.getLogger(__name__)
+
+# How often every process reloads the revoked token ids written by the others
+REVOCATION_REFRESH_SECONDS = float(os.getenv("REVOCATION_REFRESH_SECONDS", "30"))
+
+
+class RevocationList:
+    """In-process mirror of the revoked_tokens collection.
+    
+    Lookups are plain set membership so authenticating a request never queries
+    the database. Revocations made by this process apply immediately; those made
+    by other processes apply after the next refresh. Entries disappear together
+    with the documents, which a TTL index removes once the token has expired.
+    """
+    def __init__(self):
+        self._revoked: Set[str] = set()
+        self._recent: Set[str] = set()
+        self.refreshed_at: Optional[datetime] = None
+        self.refresh_errors = 0
+    
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        return jti is not None and jti in self._revoked
+    
+    async def revoke(self, jti: str, expires_at: datetime):
+        """Persist a revocation until the token would have expired anyway."""
+        self._revoked.add(jti)
+        self._recent.add(jti)
+        try:
+            await db_manager.create_document(COLLECTIONS['revoked_tokens'], {"id": jti, "expires_at": expires_at})
+        except DuplicateKeyError:
+            pass  # Already revoked
+    
+    async def refresh(self):
+        """Reload every revoked token id that has not expired yet."""
+        now = datetime.utcnow()
+        # Local revocations whose insert may not be visible to the query yet are carried over
+        recent, self._recent = self._recent, set()
+        documents = await db_manager.find_documents(
+            COLLECTIONS['revoked_tokens'], {"expires_at": {"$gt": now}}, limit=None, fields=["id"]
+        )
+        self._revoked = {document['id'] for document in documents} | recent | self._recent
+        self.refreshed_at = now
+    
+    async def run(self, interval: float = REVOCATION_REFRESH_SECONDS):
+        """Refresh forever; meant to run as a background task."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.error(f"Revocation list refresh failed: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "revoked": len(self._revoked),
+            "refreshed_at": self.refreshed_at,
+            "refresh_seconds": REVOCATION_REFRESH_SECONDS,
+            "refresh_errors": self.refresh_errors
+        }
+
+
+revocation_list = RevocationList()
@@ -0,0 +1,137 @@
+import argparse
+import asyncio
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from database import db_manager, COLLECTIONS
+from models import SessionStatus
+
+# Counter fields kept on every weekly rollup document
+ROLLUP_COUNTERS = ("sessions_count", "intensity_sum", "intensity_count", "load", "minutes")
+
+
+def iso_week(moment: datetime) -> Tuple[str, datetime]:
+    """ISO week label (e.g. 2024-W05) and the Monday that starts it."""
+    year, week, weekday = moment.isocalendar()
+    week_start = datetime(moment.year, moment.month, moment.day) - timedelta(days=weekday - 1)
+    return f"{year}-W{week:02d}", week_start
+
+
+def _plain(value):
+    """Enum members (as found in freshly built documents) compared and stored by value."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def session_minutes(session: dict) -> int:
+    """Logged duration of a session, falling back to its scheduled length."""
+    if session.get('duration_min') is not None:
+        return session['duration_min']
+    if session.get('start') and session.get('end'):
+        return max(int((session['end'] - session['start']).total_seconds() // 60), 0)
+    return 0
+
+
+def session_contribution(session: Optional[dict]) -> Optional[Tuple[Tuple[str, str], Dict[str, int]]]:
+    """The rollup key and counters a session adds to its week; only done sessions count."""
+    if not session or _plain(session.get('status')) != SessionStatus.DONE.value:
+        return None
+    
+    label, _ = iso_week(session['start'])
+    intensity = session.get('intensity')
+    minutes = session_minutes(session)
+    rpe = session.get('rpe')
+    
+    counters = {
+        "sessions_count": 1,
+        f"count_by_type.{_plain(session.get('type')) or 'other'}": 1,
+        "intensity_sum": intensity or 0,
+        "intensity_count": 1 if intensity is not None else 0,
+        "load": rpe * minutes if rpe is not None else 0,
+        "minutes": minutes,
+    }
+    return (session['athlete_id'], label), counters
+
+
+class RollupAccumulator:
+    """Net per-(athlete, week) counter changes over a stream of (before, after) session pairs."""
+    def __init__(self):
+        self.net: Dict[Tuple[str, str], Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.week_starts: Dict[Tuple[str, str], datetime] = {}
+    
+    def add(self, before: Optional[dict], after: Optional[dict]):
+        for session, sign in ((before, -1), (after, 1)):
+            contribution = session_contribution(session)
+            if contribution is None:
+                continue
+            key, counters = contribution
+            self.week_starts[key] = iso_week(session['start'])[1]
+            for field, value in counters.items():
+                self.net[key][field] += sign * value
+    
+    def increments(self) -> List[Tuple[dict, dict, dict]]:
+        """(filter, $inc, $setOnInsert) triples for DatabaseManager.increment_documents."""
+        increments = []
+        for (athlete_id, label), counters in self.net.items():
+            counters = {field: value for field, value in counters.items() if value}
+            if not counters:
+                continue
+            increments.append((
+                {"athlete_id": athlete_id, "iso_week": label},
+                counters,
+                {"id": str(uuid.uuid4()), "week_start": self.week_starts[(athlete_id, label)]}
+            ))
+        return increments
+
+
+def rollup_increments(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]) -> List[Tuple[dict, dict, dict]]:
+    """Net $inc per (athlete, week) for a batch of (before, after) session changes."""
+    accumulator = RollupAccumulator()
+    for before, after in changes:
+        accumulator.add(before, after)
+    return accumulator.increments()
+
+
+async def apply_session_changes(changes: Iterable[Tuple[Optional[dict], Optional[dict]]]):
+    """Keep weekly rollups in step with session creates (None, new), updates (old, new) and deletes (old, None)."""
+    await db_manager.increment_documents(COLLECTIONS['weekly_rollups'], rollup_increments(changes))
+
+
+async def rebuild_rollups(athlete_id: Optional[str] = None) -> int:
+    """Recompute weekly rollups from the raw sessions, for one athlete or everyone."""
+    query = {"status": SessionStatus.DONE.value}
+    if athlete_id:
+        query["athlete_id"] = athlete_id
+    
+    fields = ["id", "athlete_id", "type", "status", "start", "end", "intensity", "rpe", "duration_min"]
+    accumulator = RollupAccumulator()
+    async for session in db_manager.iter_documents(COLLECTIONS['sessions'], query, fields=fields):
+        accumulator.add(None, session)
+    
+    documents = []
+    for match, counters, defaults in accumulator.increments():
+        document = {**match, **defaults, "count_by_type": {}}
+        for field in ROLLUP_COUNTERS:
+            document[field] = counters.get(field, 0)
+        for field, value in counters.items():
+            if field.startswith("count_by_type."):
+                document["count_by_type"][field.split(".", 1)[1]] = value
+        documents.append(document)
+    
+    await db_manager.delete_documents(COLLECTIONS['weekly_rollups'], {"athlete_id": athlete_id} if athlete_id else {})
+    await db_manager.create_documents(COLLECTIONS['weekly_rollups'], documents)
+    return len(documents)
+
+
+async def _rebuild(athlete_id: Optional[str]):
+    count = await rebuild_rollups(athlete_id)
+    print(f"Rebuilt {count} weekly rollup(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild weekly training rollups from the sessions collection.")
+    parser.add_argument("--athlete", help="only rebuild this athlete's rollups")
+    args = parser.parse_args()
+    asyncio.run(_rebuild(args.athlete))
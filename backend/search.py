@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import re
+import unicodedata
+from typing import List, Optional
+
+from database import db_manager, COLLECTIONS
+
+# Candidates ranked per search; bounds the work regardless of roster size
+MAX_SEARCH_CANDIDATES = 200
+
+_TOKEN_SPLIT = re.compile(r"[\W_]+")
+
+
+def normalize_tokens(text: Optional[str]) -> List[str]:
+    """Accent-folded, case-folded alphanumeric tokens of a piece of text, in any script."""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text)
+    folded = "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+    return [token for token in _TOKEN_SPLIT.split(folded) if token]
+
+
+def name_tokens(first_name: Optional[str], last_name: Optional[str]) -> List[str]:
+    """Search tokens stored on an athlete document, in name order without duplicates."""
+    return list(dict.fromkeys(normalize_tokens(first_name) + normalize_tokens(last_name)))
+
+
+def search_query(text: str) -> Optional[dict]:
+    """Query matching athletes with a name token starting with every token of the text.
+    
+    Anchored, case-sensitive prefix regexes on normalized tokens are answered from
+    the multikey index on search_tokens. Returns None when the text has no tokens.
+    """
+    tokens = normalize_tokens(text)
+    if not tokens:
+        return None
+    clauses = [{"search_tokens": {"$regex": f"^{re.escape(token)}"}} for token in tokens]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def exact_search_query(text: str) -> Optional[dict]:
+    """Query matching athletes with a whole name token equal to every token of the text."""
+    tokens = normalize_tokens(text)
+    if not tokens:
+        return None
+    clauses = [{"search_tokens": token} for token in tokens]
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def search_score(athlete: dict, text: str) -> float:
+    """Rank a candidate: whole-token matches beat prefixes, and matching the first name first helps."""
+    query_tokens = normalize_tokens(text)
+    tokens = athlete.get('search_tokens') or name_tokens(athlete.get('first_name'), athlete.get('last_name'))
+    score = 0.0
+    for position, query_token in enumerate(query_tokens):
+        if query_token in tokens:
+            score += 2
+        elif any(token.startswith(query_token) for token in tokens):
+            score += 1
+        if position < len(tokens) and tokens[position].startswith(query_token):
+            score += 0.5
+    return score
+
+
+async def backfill_search_tokens(reindex: bool = False) -> int:
+    """Store search tokens on athletes that lack them (or on every athlete when reindexing)."""
+    query = {} if reindex else {"search_tokens": {"$exists": False}}
+    updates = []
+    async for athlete in db_manager.iter_documents(
+        COLLECTIONS['athletes'], query, fields=["id", "first_name", "last_name"]
+    ):
+        updates.append((athlete['id'], {"search_tokens": name_tokens(athlete.get('first_name'), athlete.get('last_name'))}))
+    
+    await db_manager.bulk_write(COLLECTIONS['athletes'], updates=updates)
+    return len(updates)
+
+
+async def _reindex():
+    count = await backfill_search_tokens(reindex=True)
+    print(f"Reindexed search tokens for {count} athlete(s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute the name search tokens of every athlete.")
+    parser.parse_args()
+    asyncio.run(_reindex())
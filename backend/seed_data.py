@@ -1,13 +1,126 @@
 import asyncio
 from datetime import datetime, timedelta
+from typing import List, Optional
 from database import db_manager, COLLECTIONS
 from auth import get_password_hash
 from models import (
     UserRole, Sex, GoalType, Priority, GoalStatus, 
     ProgramStatus, SessionType, SessionStatus, ExerciseCategory
 )
+from search import name_tokens
 import uuid
 
+# Document builders shared with generate_data.py. Extra keyword arguments are
+# stored as given; ids default to a random uuid4.
+
+def athlete_document(first_name: str, last_name: str, doc_id: Optional[str] = None, **fields) -> dict:
+    """Athlete with its name search tokens, as create_athlete stores them."""
+    return {
+        "id": doc_id or str(uuid.uuid4()),
+        "first_name": first_name,
+        "last_name": last_name,
+        "search_tokens": name_tokens(first_name, last_name),
+        "coach_name": "Coach Johnson",
+        **fields
+    }
+
+def goal_document(
+    athlete_id: str,
+    name: str,
+    goal_type: GoalType,
+    start_date: datetime,
+    end_date: datetime,
+    priority: Priority,
+    doc_id: Optional[str] = None,
+    **fields
+) -> dict:
+    return {
+        "id": doc_id or str(uuid.uuid4()),
+        "athlete_id": athlete_id,
+        "name": name,
+        "type": goal_type.value,
+        "start_date": start_date,
+        "end_date": end_date,
+        "priority": priority.value,
+        "status": GoalStatus.ACTIVE.value,
+        **fields
+    }
+
+def program_document(
+    athlete_id: str,
+    goal_id: str,
+    name: str,
+    start_date: datetime,
+    end_date: datetime,
+    weekly_frequency: int,
+    doc_id: Optional[str] = None,
+    **fields
+) -> dict:
+    return {
+        "id": doc_id or str(uuid.uuid4()),
+        "athlete_id": athlete_id,
+        "goal_id": goal_id,
+        "name": name,
+        "start_date": start_date,
+        "end_date": end_date,
+        "weekly_frequency": weekly_frequency,
+        "status": ProgramStatus.ACTIVE.value,
+        **fields
+    }
+
+def session_document(
+    program_id: str,
+    athlete_id: str,
+    title: str,
+    session_type: SessionType,
+    start: datetime,
+    end: datetime,
+    intensity: int,
+    tags: List[str],
+    doc_id: Optional[str] = None,
+    **fields
+) -> dict:
+    return {
+        "id": doc_id or str(uuid.uuid4()),
+        "program_id": program_id,
+        "athlete_id": athlete_id,
+        "title": title,
+        "type": session_type.value,
+        "start": start,
+        "end": end,
+        "intensity": intensity,
+        "tags": tags,
+        "status": SessionStatus.SCHEDULED.value,
+        "notes": None,
+        **fields
+    }
+
+def assessment_document(
+    athlete_id: str,
+    date: datetime,
+    doc_id: Optional[str] = None,
+    notes: Optional[str] = None,
+    **scores: int
+) -> dict:
+    return {"id": doc_id or str(uuid.uuid4()), "athlete_id": athlete_id, "date": date, **scores, "notes": notes}
+
+def record_document(
+    athlete_id: str,
+    discipline: str,
+    value: str,
+    date: datetime,
+    doc_id: Optional[str] = None,
+    notes: Optional[str] = None
+) -> dict:
+    return {
+        "id": doc_id or str(uuid.uuid4()),
+        "athlete_id": athlete_id,
+        "discipline": discipline,
+        "value": value,
+        "date": date,
+        "notes": notes
+    }
+
 async def create_seed_data():
     """Create seed data for the application."""
     print("🌱 Creating seed data...")
@@ -28,70 +141,64 @@ async def create_seed_data():
     
     # Create 3 sample athletes
     athletes_data = [
-        {
-            "id": str(uuid.uuid4()),
-            "first_name": "Sarah",
-            "last_name": "Miller",
-            "birth_date": datetime(2001, 3, 15),
-            "sex": Sex.FEMALE.value,
-            "height_cm": 170.0,
-            "weight_kg": 58.0,
-            "specialties": ["100m", "200m", "Long Jump"],
-            "sector": "Track & Field",
-            "category": "Senior",
-            "coach_name": "Coach Johnson",
-            "club": "Athletics Club",
-            "health_status": "Excellent",
-            "strengths": ["Speed", "Explosive power", "Technique"],
-            "weaknesses": ["Endurance", "Start reaction"],
-            "allergies_limitations": ["Pollen allergy"],
-            "notes": "Promising young sprinter with excellent technique"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "first_name": "Marcus",
-            "last_name": "Thompson",
-            "birth_date": datetime(1998, 7, 22),
-            "sex": Sex.MALE.value,
-            "height_cm": 185.0,
-            "weight_kg": 110.0,
-            "specialties": ["Discus", "Shot Put"],
-            "sector": "Field Events",
-            "category": "Elite",
-            "coach_name": "Coach Johnson",
-            "club": "Athletics Club",
-            "health_status": "Good",
-            "strengths": ["Raw power", "Technique", "Mental focus"],
-            "weaknesses": ["Mobility", "Recovery"],
-            "allergies_limitations": [],
-            "injuries": [
+        athlete_document(
+            first_name="Sarah",
+            last_name="Miller",
+            birth_date=datetime(2001, 3, 15),
+            sex=Sex.FEMALE.value,
+            height_cm=170.0,
+            weight_kg=58.0,
+            specialties=["100m", "200m", "Long Jump"],
+            sector="Track & Field",
+            category="Senior",
+            club="Athletics Club",
+            health_status="Excellent",
+            strengths=["Speed", "Explosive power", "Technique"],
+            weaknesses=["Endurance", "Start reaction"],
+            allergies_limitations=["Pollen allergy"],
+            notes="Promising young sprinter with excellent technique"
+        ),
+        athlete_document(
+            first_name="Marcus",
+            last_name="Thompson",
+            birth_date=datetime(1998, 7, 22),
+            sex=Sex.MALE.value,
+            height_cm=185.0,
+            weight_kg=110.0,
+            specialties=["Discus", "Shot Put"],
+            sector="Field Events",
+            category="Elite",
+            club="Athletics Club",
+            health_status="Good",
+            strengths=["Raw power", "Technique", "Mental focus"],
+            weaknesses=["Mobility", "Recovery"],
+            allergies_limitations=[],
+            injuries=[
                 {
                     "date": datetime(2023, 8, 15),
                     "type": "Shoulder strain",
                     "notes": "Minor strain during training, fully recovered"
                 }
             ],
-            "notes": "Strong thrower with consistent performance"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "first_name": "Elena",
-            "last_name": "Rodriguez",
-            "birth_date": datetime(2000, 11, 8),
-            "sex": Sex.FEMALE.value,
-            "height_cm": 165.0,
-            "weight_kg": 52.0,
-            "specialties": ["800m", "1500m"],
-            "sector": "Middle Distance",
-            "category": "Senior",
-            "coach_name": "Coach Johnson",
-            "club": "Athletics Club",
-            "health_status": "Excellent",
-            "strengths": ["Endurance", "Race tactics", "Mental toughness"],
-            "weaknesses": ["Speed", "Kick finish"],
-            "allergies_limitations": ["Lactose intolerance"],
-            "notes": "Tactical runner with great endurance base"
-        }
+            notes="Strong thrower with consistent performance"
+        ),
+        athlete_document(
+            first_name="Elena",
+            last_name="Rodriguez",
+            birth_date=datetime(2000, 11, 8),
+            sex=Sex.FEMALE.value,
+            height_cm=165.0,
+            weight_kg=52.0,
+            specialties=["800m", "1500m"],
+            sector="Middle Distance",
+            category="Senior",
+            club="Athletics Club",
+            health_status="Excellent",
+            strengths=["Endurance", "Race tactics", "Mental toughness"],
+            weaknesses=["Speed", "Kick finish"],
+            allergies_limitations=["Lactose intolerance"],
+            notes="Tactical runner with great endurance base"
+        )
     ]
     
     created_athletes = []
@@ -103,61 +210,53 @@ async def create_seed_data():
     # Create sample goals for each athlete
     goals_data = [
         # Sarah's goals
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[0]['id'],
-            "name": "Sub-11 seconds in 100m",
-            "type": GoalType.PERFORMANCE.value,
-            "description": "Break the 11-second barrier in 100m sprint",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=180),
-            "priority": Priority.HIGH.value,
-            "initial_value": "11.24",
-            "target_value": "10.99",
-            "current_value": "11.18",
-            "status": GoalStatus.ACTIVE.value
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[0]['id'],
-            "name": "Improve start technique",
-            "type": GoalType.TECHNICAL.value,
-            "description": "Focus on reaction time and block starts",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=90),
-            "priority": Priority.MEDIUM.value,
-            "status": GoalStatus.ACTIVE.value
-        },
+        goal_document(
+            athlete_id=created_athletes[0]['id'],
+            name="Sub-11 seconds in 100m",
+            goal_type=GoalType.PERFORMANCE,
+            description="Break the 11-second barrier in 100m sprint",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=180),
+            priority=Priority.HIGH,
+            initial_value="11.24",
+            target_value="10.99",
+            current_value="11.18"
+        ),
+        goal_document(
+            athlete_id=created_athletes[0]['id'],
+            name="Improve start technique",
+            goal_type=GoalType.TECHNICAL,
+            description="Focus on reaction time and block starts",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=90),
+            priority=Priority.MEDIUM
+        ),
         # Marcus's goals
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[1]['id'],  
-            "name": "65m+ discus throw",
-            "type": GoalType.PERFORMANCE.value,
-            "description": "Achieve personal best of 65+ meters in discus",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=120),
-            "priority": Priority.HIGH.value,
-            "initial_value": "62.5m",
-            "target_value": "65.0m",
-            "current_value": "63.2m",
-            "status": GoalStatus.ACTIVE.value
-        },
+        goal_document(
+            athlete_id=created_athletes[1]['id'],
+            name="65m+ discus throw",
+            goal_type=GoalType.PERFORMANCE,
+            description="Achieve personal best of 65+ meters in discus",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=120),
+            priority=Priority.HIGH,
+            initial_value="62.5m",
+            target_value="65.0m",
+            current_value="63.2m"
+        ),
         # Elena's goals
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[2]['id'],
-            "name": "Sub-2:10 in 800m",
-            "type": GoalType.PERFORMANCE.value,
-            "description": "Break 2:10 barrier in 800m",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=150),
-            "priority": Priority.HIGH.value,
-            "initial_value": "2:12.45",
-            "target_value": "2:09.99",
-            "current_value": "2:11.20",
-            "status": GoalStatus.ACTIVE.value
-        }
+        goal_document(
+            athlete_id=created_athletes[2]['id'],
+            name="Sub-2:10 in 800m",
+            goal_type=GoalType.PERFORMANCE,
+            description="Break 2:10 barrier in 800m",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=150),
+            priority=Priority.HIGH,
+            initial_value="2:12.45",
+            target_value="2:09.99",
+            current_value="2:11.20"
+        )
     ]
     
     created_goals = []
@@ -168,42 +267,36 @@ async def create_seed_data():
     
     # Create training programs
     programs_data = [
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[0]['id'],
-            "goal_id": created_goals[0]['id'],
-            "name": "Sprint Speed Development",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=90),
-            "weekly_frequency": 4,
-            "structure_text": "Mon: Speed work, Wed: Technique, Fri: Power, Sat: Competition prep",
-            "status": ProgramStatus.ACTIVE.value,
-            "notes": "Focus on acceleration and maximum speed development"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[1]['id'],
-            "goal_id": created_goals[2]['id'],
-            "name": "Throwing Power Program",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=120),
-            "weekly_frequency": 5,
-            "structure_text": "Mon: Strength, Tue: Technique, Thu: Power, Fri: Throws, Sat: Recovery",
-            "status": ProgramStatus.ACTIVE.value,
-            "notes": "Periodized program for discus throwing development"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[2]['id'],
-            "goal_id": created_goals[3]['id'],
-            "name": "Middle Distance Base",
-            "start_date": datetime.now(),
-            "end_date": datetime.now() + timedelta(days=100),
-            "weekly_frequency": 6,
-            "structure_text": "Daily training with varied intensities and recovery",
-            "status": ProgramStatus.ACTIVE.value,
-            "notes": "Base building phase for 800m specialization"
-        }
+        program_document(
+            athlete_id=created_athletes[0]['id'],
+            goal_id=created_goals[0]['id'],
+            name="Sprint Speed Development",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=90),
+            weekly_frequency=4,
+            structure_text="Mon: Speed work, Wed: Technique, Fri: Power, Sat: Competition prep",
+            notes="Focus on acceleration and maximum speed development"
+        ),
+        program_document(
+            athlete_id=created_athletes[1]['id'],
+            goal_id=created_goals[2]['id'],
+            name="Throwing Power Program",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=120),
+            weekly_frequency=5,
+            structure_text="Mon: Strength, Tue: Technique, Thu: Power, Fri: Throws, Sat: Recovery",
+            notes="Periodized program for discus throwing development"
+        ),
+        program_document(
+            athlete_id=created_athletes[2]['id'],
+            goal_id=created_goals[3]['id'],
+            name="Middle Distance Base",
+            start_date=datetime.now(),
+            end_date=datetime.now() + timedelta(days=100),
+            weekly_frequency=6,
+            structure_text="Daily training with varied intensities and recovery",
+            notes="Base building phase for 800m specialization"
+        )
     ]
     
     created_programs = []
@@ -276,92 +369,80 @@ async def create_seed_data():
     
     # Sarah's sessions
     sessions_data.extend([
-        {
-            "id": str(uuid.uuid4()),
-            "program_id": created_programs[0]['id'],
-            "athlete_id": created_athletes[0]['id'],
-            "title": "Speed Development",
-            "type": SessionType.SPEED.value,
-            "start": base_date + timedelta(days=1, hours=16),
-            "end": base_date + timedelta(days=1, hours=17, minutes=30),
-            "intensity": 8,
-            "tags": ["sprint", "acceleration"],
-            "status": SessionStatus.SCHEDULED.value,
-            "notes": "Focus on 30m acceleration"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "program_id": created_programs[0]['id'],
-            "athlete_id": created_athletes[0]['id'],
-            "title": "Technique Session",
-            "type": SessionType.TECHNIQUE.value,
-            "start": base_date + timedelta(days=3, hours=15),
-            "end": base_date + timedelta(days=3, hours=16, minutes=30),
-            "intensity": 6,
-            "tags": ["technique", "starts"],
-            "status": SessionStatus.SCHEDULED.value,
-            "notes": "Block start practice"
-        }
+        session_document(
+            program_id=created_programs[0]['id'],
+            athlete_id=created_athletes[0]['id'],
+            title="Speed Development",
+            session_type=SessionType.SPEED,
+            start=base_date + timedelta(days=1, hours=16),
+            end=base_date + timedelta(days=1, hours=17, minutes=30),
+            intensity=8,
+            tags=["sprint", "acceleration"],
+            notes="Focus on 30m acceleration"
+        ),
+        session_document(
+            program_id=created_programs[0]['id'],
+            athlete_id=created_athletes[0]['id'],
+            title="Technique Session",
+            session_type=SessionType.TECHNIQUE,
+            start=base_date + timedelta(days=3, hours=15),
+            end=base_date + timedelta(days=3, hours=16, minutes=30),
+            intensity=6,
+            tags=["technique", "starts"],
+            notes="Block start practice"
+        )
     ])
     
     # Marcus's sessions  
     sessions_data.extend([
-        {
-            "id": str(uuid.uuid4()),
-            "program_id": created_programs[1]['id'],
-            "athlete_id": created_athletes[1]['id'],
-            "title": "Strength Training",
-            "type": SessionType.GYM.value,
-            "start": base_date + timedelta(days=1, hours=10),
-            "end": base_date + timedelta(days=1, hours=11, minutes=30),
-            "intensity": 7,
-            "tags": ["strength", "power"],
-            "status": SessionStatus.SCHEDULED.value,
-            "notes": "Focus on explosive movements"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "program_id": created_programs[1]['id'],
-            "athlete_id": created_athletes[1]['id'],
-            "title": "Throwing Practice",
-            "type": SessionType.TECHNIQUE.value,
-            "start": base_date + timedelta(days=2, hours=16),
-            "end": base_date + timedelta(days=2, hours=18),
-            "intensity": 8,
-            "tags": ["discus", "technique"],
-            "status": SessionStatus.SCHEDULED.value,
-            "notes": "Full throwing session"
-        }
+        session_document(
+            program_id=created_programs[1]['id'],
+            athlete_id=created_athletes[1]['id'],
+            title="Strength Training",
+            session_type=SessionType.GYM,
+            start=base_date + timedelta(days=1, hours=10),
+            end=base_date + timedelta(days=1, hours=11, minutes=30),
+            intensity=7,
+            tags=["strength", "power"],
+            notes="Focus on explosive movements"
+        ),
+        session_document(
+            program_id=created_programs[1]['id'],
+            athlete_id=created_athletes[1]['id'],
+            title="Throwing Practice",
+            session_type=SessionType.TECHNIQUE,
+            start=base_date + timedelta(days=2, hours=16),
+            end=base_date + timedelta(days=2, hours=18),
+            intensity=8,
+            tags=["discus", "technique"],
+            notes="Full throwing session"
+        )
     ])
     
     # Elena's sessions
     sessions_data.extend([
-        {
-            "id": str(uuid.uuid4()),
-            "program_id": created_programs[2]['id'],
-            "athlete_id": created_athletes[2]['id'],
-            "title": "Tempo Run",
-            "type": SessionType.ENDURANCE.value,
-            "start": base_date + timedelta(days=1, hours=7),
-            "end": base_date + timedelta(days=1, hours=8, minutes=15),
-            "intensity": 5,
-            "tags": ["tempo", "aerobic"],
-            "status": SessionStatus.SCHEDULED.value,
-            "notes": "6km tempo at threshold pace"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "program_id": created_programs[2]['id'],
-            "athlete_id": created_athletes[2]['id'],
-            "title": "Track Intervals",
-            "type": SessionType.SPEED.value,
-            "start": base_date + timedelta(days=4, hours=17),
-            "end": base_date + timedelta(days=4, hours=18, minutes=30),
-            "intensity": 9,
-            "tags": ["intervals", "lactate"],
-            "status": SessionStatus.SCHEDULED.value,
-            "notes": "400m repeats at race pace"
-        }
+        session_document(
+            program_id=created_programs[2]['id'],
+            athlete_id=created_athletes[2]['id'],
+            title="Tempo Run",
+            session_type=SessionType.ENDURANCE,
+            start=base_date + timedelta(days=1, hours=7),
+            end=base_date + timedelta(days=1, hours=8, minutes=15),
+            intensity=5,
+            tags=["tempo", "aerobic"],
+            notes="6km tempo at threshold pace"
+        ),
+        session_document(
+            program_id=created_programs[2]['id'],
+            athlete_id=created_athletes[2]['id'],
+            title="Track Intervals",
+            session_type=SessionType.SPEED,
+            start=base_date + timedelta(days=4, hours=17),
+            end=base_date + timedelta(days=4, hours=18, minutes=30),
+            intensity=9,
+            tags=["intervals", "lactate"],
+            notes="400m repeats at race pace"
+        )
     ])
     
     for session_data in sessions_data:
@@ -370,54 +451,51 @@ async def create_seed_data():
     
     # Create sample physical assessments
     assessments_data = [
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[0]['id'],
-            "date": datetime.now() - timedelta(days=30),
-            "strength_max": 7,
-            "strength_endurance": 6,
-            "strength_explosive": 9,
-            "speed_linear": 9,
-            "agility": 8,
-            "power": 9,
-            "mobility": 7,
-            "endurance_aerobic": 5,
-            "endurance_lactate": 6,
-            "icm": 8,
-            "notes": "Strong in power and speed metrics"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[1]['id'],
-            "date": datetime.now() - timedelta(days=25),
-            "strength_max": 9,
-            "strength_endurance": 7,
-            "strength_explosive": 8,
-            "speed_linear": 6,
-            "agility": 5,
-            "power": 9,
-            "mobility": 5,
-            "endurance_aerobic": 4,
-            "endurance_lactate": 5,
-            "icm": 7,
-            "notes": "Excellent strength and power, needs mobility work"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[2]['id'],
-            "date": datetime.now() - timedelta(days=20),
-            "strength_max": 6,
-            "strength_endurance": 8,
-            "strength_explosive": 6,
-            "speed_linear": 7,
-            "agility": 7,
-            "power": 6,
-            "mobility": 8,
-            "endurance_aerobic": 9,
-            "endurance_lactate": 9,
-            "icm": 8,
-            "notes": "Outstanding endurance profile"
-        }
+        assessment_document(
+            athlete_id=created_athletes[0]['id'],
+            date=datetime.now() - timedelta(days=30),
+            strength_max=7,
+            strength_endurance=6,
+            strength_explosive=9,
+            speed_linear=9,
+            agility=8,
+            power=9,
+            mobility=7,
+            endurance_aerobic=5,
+            endurance_lactate=6,
+            icm=8,
+            notes="Strong in power and speed metrics"
+        ),
+        assessment_document(
+            athlete_id=created_athletes[1]['id'],
+            date=datetime.now() - timedelta(days=25),
+            strength_max=9,
+            strength_endurance=7,
+            strength_explosive=8,
+            speed_linear=6,
+            agility=5,
+            power=9,
+            mobility=5,
+            endurance_aerobic=4,
+            endurance_lactate=5,
+            icm=7,
+            notes="Excellent strength and power, needs mobility work"
+        ),
+        assessment_document(
+            athlete_id=created_athletes[2]['id'],
+            date=datetime.now() - timedelta(days=20),
+            strength_max=6,
+            strength_endurance=8,
+            strength_explosive=6,
+            speed_linear=7,
+            agility=7,
+            power=6,
+            mobility=8,
+            endurance_aerobic=9,
+            endurance_lactate=9,
+            icm=8,
+            notes="Outstanding endurance profile"
+        )
     ]
     
     for assessment_data in assessments_data:
@@ -426,38 +504,34 @@ async def create_seed_data():
     
     # Create sample personal records
     records_data = [
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[0]['id'],
-            "discipline": "100m",
-            "value": "11.18",
-            "date": datetime.now() - timedelta(days=15),
-            "notes": "Season best with tailwind 1.2m/s"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[0]['id'],
-            "discipline": "200m",
-            "value": "23.45",
-            "date": datetime.now() - timedelta(days=45),
-            "notes": "Personal best from regional championships"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[1]['id'],
-            "discipline": "Discus",
-            "value": "63.2m",
-            "date": datetime.now() - timedelta(days=10),
-            "notes": "Recent personal best"
-        },
-        {
-            "id": str(uuid.uuid4()),
-            "athlete_id": created_athletes[2]['id'],
-            "discipline": "800m",
-            "value": "2:11.20",
-            "date": datetime.now() - timedelta(days=8),
-            "notes": "Strong negative split race"
-        }
+        record_document(
+            athlete_id=created_athletes[0]['id'],
+            discipline="100m",
+            value="11.18",
+            date=datetime.now() - timedelta(days=15),
+            notes="Season best with tailwind 1.2m/s"
+        ),
+        record_document(
+            athlete_id=created_athletes[0]['id'],
+            discipline="200m",
+            value="23.45",
+            date=datetime.now() - timedelta(days=45),
+            notes="Personal best from regional championships"
+        ),
+        record_document(
+            athlete_id=created_athletes[1]['id'],
+            discipline="Discus",
+            value="63.2m",
+            date=datetime.now() - timedelta(days=10),
+            notes="Recent personal best"
+        ),
+        record_document(
+            athlete_id=created_athletes[2]['id'],
+            discipline="800m",
+            value="2:11.20",
+            date=datetime.now() - timedelta(days=8),
+            notes="Strong negative split race"
+        )
     ]
     
     for record_data in records_data:
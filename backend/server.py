@@ -1,30 +1,51 @@
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, Request, Response
+from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, Request, Response, Query
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from pydantic import BaseModel
 from fastapi.security import HTTPBearer
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 import os
+import asyncio
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Type
 from datetime import datetime, timedelta
 
 # Import our models and utilities
 from models import *
 from auth import (
     get_current_user, get_current_coach, get_current_athlete,
-    verify_password, get_password_hash, create_access_token,
-    AuthError
+    verify_and_update_password_async, get_password_hash_async, create_access_token,
+    get_token_from_request, decode_token, setup_password_hashing, BCRYPT_TARGET_MS,
+    AuthError, PasswordHasherBusy, password_hasher, token_cache, ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from database import db_manager, COLLECTIONS
+from analytics import (
+    OVERVIEW_WINDOWS, overview_pipeline, summarize_overview, summarize_roster_overview,
+    ASSESSMENT_METRICS, ASSESSMENT_STATS, assessment_matrix, rolling_mean, deltas, slopes, to_optional_list,
+    daily_load_pipeline, load_window, load_matrix, load_metrics, load_summaries, load_series
+)
+from pagination import PageParams, InvalidCursor, page_params, cursor_page_params
+from revocation import revocation_list
+from rollups import apply_session_changes
+from search import (
+    MAX_SEARCH_CANDIDATES, name_tokens, search_query, exact_search_query, search_score, backfill_search_tokens
+)
+from serialization import trusted_dump, trusted_response, dumps, ProfiledORJSONResponse
+from profiling import ProfiledRoute, ProfilingMiddleware, record_db_call
+from metrics import (
+    PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, registry, observe_db_call, pool_listener, monitor_event_loop
+)
+from etag import ETAG_FIELDS, document_etag, list_etag, if_none_match, etag_matches, not_modified
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # Create the main app
-app = FastAPI(title="Athletica API", version="1.0.0")
+app = FastAPI(title="Athletica API", version="1.0.0", default_response_class=ProfiledORJSONResponse)
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", route_class=ProfiledRoute)
 
 # Security
 security = HTTPBearer()
@@ -36,8 +57,19 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "ETag", "Server-Timing"],
 )
 
+# Profile a sample of requests (PROFILING_SAMPLE_RATE): Server-Timing header plus a log line
+app.add_middleware(ProfilingMiddleware)
+db_manager.add_listener(record_db_call)
+
+# Prometheus metrics, scraped from /metrics
+app.add_middleware(MetricsMiddleware)
+db_manager.add_listener(observe_db_call)
+if hasattr(db_manager.backend, "event_listeners"):
+    db_manager.backend.event_listeners.append(pool_listener)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -45,8 +77,158 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+async def fetch_page(
+    collection: str,
+    query: dict,
+    page: PageParams,
+    fields: Optional[List[str]] = None
+) -> Tuple[List[dict], Dict[str, str]]:
+    """Fetch one page of a list endpoint along with the headers that describe it."""
+    try:
+        documents, next_cursor = await db_manager.find_page(collection, query, page.limit, page.cursor, fields)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    headers = {}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if page.include_total:
+        headers["X-Total-Count"] = str(await db_manager.estimate_count(collection, query))
+    
+    return documents, headers
+
+
+def requested_fields(model: Type[BaseModel], page: PageParams) -> Optional[List[str]]:
+    """Validate the fields a client asked for; the id is always included."""
+    if not page.fields:
+        return None
+    
+    unknown = [field for field in page.fields if field not in model.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    
+    return list(dict.fromkeys(["id"] + page.fields))
+
+
+def wants_ndjson(request: Request) -> bool:
+    """Whether the client opted into a streamed NDJSON response."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+async def list_documents(
+    request: Request,
+    collection: str,
+    query: dict,
+    model: Type[BaseModel],
+    page: PageParams
+) -> Response:
+    """Serve a list endpoint as a single page, or as an NDJSON stream when requested.
+    
+    Documents come from our own database, so they are serialized straight to
+    JSON without being validated again. When the client restricts the fields,
+    documents are projected in MongoDB and only those fields are encoded.
+    """
+    fields = requested_fields(model, page)
+    
+    if not wants_ndjson(request):
+        # Conditional requests are first answered from a projection-only query
+        validator = if_none_match(request)
+        if validator:
+            versions, headers = await fetch_page(collection, query, page, ETAG_FIELDS)
+            etag = list_etag(versions, str(request.url.query))
+            if etag_matches(validator, etag):
+                return not_modified(etag, headers)
+        
+        # updated_at is fetched with projections too, since the ETag depends on it
+        fetched_fields = fields and list(dict.fromkeys(fields + ETAG_FIELDS))
+        documents, headers = await fetch_page(collection, query, page, fetched_fields)
+        headers["ETag"] = list_etag(documents, str(request.url.query))
+        return trusted_response(model, documents, fields, headers)
+    
+    try:
+        documents = db_manager.iter_documents(collection, query, page.cursor, page.stream_limit, fields)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    async def lines():
+        async for document in documents:
+            yield dumps(trusted_dump(model, document, fields)) + b"\n"
+    
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def changed_fields(item: BaseModel) -> dict:
+    """Fields of a bulk update item that were provided, without its id."""
+    return {k: v for k, v in item.dict(exclude={'id'}).items() if v is not None}
+
+
+def bulk_result(
+    documents: List[dict],
+    updates: List[Tuple[str, int, str, dict]],
+    errors: List[Optional[str]]
+) -> BulkResult:
+    """Per-item results for created documents followed by (op, index, id, fields) updates."""
+    results = [
+        BulkItemResult(op="create", index=i, id=document['id'], ok=error is None, error=error)
+        for i, (document, error) in enumerate(zip(documents, errors))
+    ]
+    for (op, index, doc_id, _), error in zip(updates, errors[len(documents):]):
+        results.append(BulkItemResult(op=op, index=index, id=doc_id, ok=error is None, error=error))
+    
+    return BulkResult(
+        created=sum(1 for result in results if result.ok and result.op == "create"),
+        updated=sum(1 for result in results if result.ok and result.op != "create"),
+        failed=sum(1 for result in results if not result.ok),
+        results=results
+    )
+
+
+async def run_bulk(
+    collection: str,
+    model: Type[BaseModel],
+    creates: List[BaseModel],
+    updates: List[Tuple[str, int, str, dict]]
+) -> BulkResult:
+    """Write a batch of creates and (op, index, id, fields) updates and report per-item results."""
+    documents = [model(**item.dict()).dict() for item in creates]
+    errors = await db_manager.bulk_write(
+        collection,
+        documents,
+        [(doc_id, update_data) for _, _, doc_id, update_data in updates]
+    )
+    return bulk_result(documents, updates, errors)
+
 
 # AUTHENTICATION ENDPOINTS
+def hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many concurrent logins, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def hash_password(password: str) -> str:
+    try:
+        return await get_password_hash_async(password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+
+
+async def check_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password, returning a replacement hash when the stored cost is outdated."""
+    try:
+        return await verify_and_update_password_async(password, hashed_password)
+    except PasswordHasherBusy:
+        raise hasher_busy()
+
+
 @api_router.post("/auth/register", response_model=UserResponse)
 async def register(user_data: UserCreate):
     """Register a new user (coach only for now)."""
@@ -59,7 +241,7 @@ async def register(user_data: UserCreate):
         )
     
     # Hash password and create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     user_dict = user_data.dict()
     user_dict.pop('password')
     user_dict['hashed_password'] = hashed_password
@@ -85,12 +267,17 @@ async def login(response: Response, login_data: LoginRequest):
         )
     
     # Verify password
-    if not verify_password(login_data.password, user_doc['hashed_password']):
+    valid, new_hash = await check_password(login_data.password, user_doc['hashed_password'])
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Transparently upgrade hashes weaker than the configured bcrypt cost
+    if new_hash:
+        await db_manager.update_document(COLLECTIONS['users'], user_doc['id'], {"hashed_password": new_hash})
+    
     # Create access token
     access_token = create_access_token(
         data={
@@ -113,8 +300,23 @@ async def login(response: Response, login_data: LoginRequest):
 
 
 @api_router.post("/auth/logout")
-async def logout(response: Response):
-    """Logout user."""
+async def logout(request: Request, response: Response):
+    """Logout user and revoke the token until it would have expired."""
+    token = get_token_from_request(request)
+    if token:
+        try:
+            token_data, expires_at = decode_token(token)
+        except AuthError:
+            token_data = None  # Expired or invalid tokens need no revocation
+        
+        if token_data and token_data.jti:
+            # Tokens without exp never lapse; keep those revoked as long as a new token would live
+            if expires_at is None:
+                revoked_until = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            else:
+                revoked_until = datetime.utcfromtimestamp(expires_at)
+            await revocation_list.revoke(token_data.jti, revoked_until)
+    
     response.delete_cookie("access_token")
     return {"message": "Successfully logged out"}
 
@@ -126,45 +328,96 @@ async def get_me(current_user: TokenData = Depends(get_current_user)):
     if not user_doc:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return UserResponse(**user_doc)
+    return ProfiledORJSONResponse(trusted_dump(UserResponse, user_doc))
 
 
 # ATHLETE ENDPOINTS
 @api_router.get("/athletes", response_model=List[Athlete])
 async def get_athletes(
+    request: Request,
     name: Optional[str] = None,
     sector: Optional[str] = None,
+    page: PageParams = Depends(page_params),
     current_user: TokenData = Depends(get_current_coach)
 ):
     """Get all athletes with optional filtering."""
     query = {}
     if name:
-        query["$or"] = [
-            {"first_name": {"$regex": name, "$options": "i"}},
-            {"last_name": {"$regex": name, "$options": "i"}}
-        ]
+        # Prefix match on normalized name tokens; input without any token matches no one
+        name_query = search_query(name)
+        if name_query is None:
+            return []
+        query.update(name_query)
     if sector:
         query["sector"] = sector
     
-    athletes = await db_manager.find_documents(COLLECTIONS['athletes'], query)
-    return [Athlete(**athlete) for athlete in athletes]
+    return await list_documents(request, COLLECTIONS['athletes'], query, Athlete, page)
+
+
+@api_router.get("/athletes/search", response_model=List[AthleteSearchResult])
+async def search_athletes(
+    q: str,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_coach)
+):
+    """Type-ahead athlete search on name prefixes, best matches first.
+    
+    At most MAX_SEARCH_CANDIDATES matches are ranked. When more match, whole-token
+    matches are taken first and the remaining slots go to prefix matches in no
+    particular order, so ranking beyond the whole-token matches is best-effort.
+    """
+    query = search_query(q)
+    if query is None:
+        return []
+    
+    fields = ["id", "first_name", "last_name", "sector", "photo_url", "search_tokens"]
+    # One extra to know whether the prefix matches were cut off
+    candidates = await db_manager.find_documents(
+        COLLECTIONS['athletes'], query, limit=MAX_SEARCH_CANDIDATES + 1, fields=fields
+    )
+    if len(candidates) > MAX_SEARCH_CANDIDATES:
+        exact = await db_manager.find_documents(
+            COLLECTIONS['athletes'], exact_search_query(q), limit=MAX_SEARCH_CANDIDATES, fields=fields
+        )
+        exact_ids = {athlete['id'] for athlete in exact}
+        prefix = [athlete for athlete in candidates if athlete['id'] not in exact_ids]
+        candidates = exact + prefix[:MAX_SEARCH_CANDIDATES - len(exact)]
+    
+    ranked = sorted(
+        candidates,
+        key=lambda athlete: (-search_score(athlete, q), athlete['last_name'], athlete['first_name'])
+    )
+    return [AthleteSearchResult(score=search_score(athlete, q), **athlete) for athlete in ranked[:limit]]
 
 
 @api_router.get("/athletes/{athlete_id}", response_model=Athlete)
-async def get_athlete(athlete_id: str, current_user: TokenData = Depends(get_current_user)):
+async def get_athlete(
+    athlete_id: str,
+    request: Request,
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get athlete by ID."""
+    # Revalidation only needs the id and updated_at
+    validator = if_none_match(request)
+    if validator:
+        version = await db_manager.get_document(COLLECTIONS['athletes'], athlete_id, ETAG_FIELDS)
+        if version and etag_matches(validator, document_etag(version)):
+            return not_modified(document_etag(version))
+    
     athlete = await db_manager.get_document(COLLECTIONS['athletes'], athlete_id)
     if not athlete:
         raise HTTPException(status_code=404, detail="Athlete not found")
     
-    return Athlete(**athlete)
+    return ProfiledORJSONResponse(trusted_dump(Athlete, athlete), headers={"ETag": document_etag(athlete)})
 
 
 @api_router.post("/athletes", response_model=Athlete)
 async def create_athlete(athlete_data: AthleteCreate, current_user: TokenData = Depends(get_current_coach)):
     """Create a new athlete."""
     athlete = Athlete(**athlete_data.dict())
-    created_athlete = await db_manager.create_document(COLLECTIONS['athletes'], athlete.dict())
+    athlete_doc = athlete.dict()
+    athlete_doc['search_tokens'] = name_tokens(athlete.first_name, athlete.last_name)
+    created_athlete = await db_manager.create_document(COLLECTIONS['athletes'], athlete_doc)
     return Athlete(**created_athlete)
 
 
@@ -175,15 +428,23 @@ async def update_athlete(
     current_user: TokenData = Depends(get_current_coach)
 ):
     """Update an athlete."""
-    # Get existing athlete
-    existing_athlete = await db_manager.get_document(COLLECTIONS['athletes'], athlete_id)
-    if not existing_athlete:
-        raise HTTPException(status_code=404, detail="Athlete not found")
-    
     # Update only provided fields
     update_data = {k: v for k, v in athlete_data.dict().items() if v is not None}
     
+    # Renames need fresh search tokens, which depend on both names, written in the same update
+    if 'first_name' in update_data or 'last_name' in update_data:
+        names = update_data
+        if 'first_name' not in update_data or 'last_name' not in update_data:
+            current = await db_manager.get_document(COLLECTIONS['athletes'], athlete_id, ["first_name", "last_name"])
+            if not current:
+                raise HTTPException(status_code=404, detail="Athlete not found")
+            names = {**current, **update_data}
+        update_data['search_tokens'] = name_tokens(names['first_name'], names['last_name'])
+    
     updated_athlete = await db_manager.update_document(COLLECTIONS['athletes'], athlete_id, update_data)
+    if not updated_athlete:
+        raise HTTPException(status_code=404, detail="Athlete not found")
+    
     return Athlete(**updated_athlete)
 
 
@@ -199,14 +460,18 @@ async def delete_athlete(athlete_id: str, current_user: TokenData = Depends(get_
 
 # GOALS ENDPOINTS
 @api_router.get("/goals", response_model=List[Goal])
-async def get_goals(athlete_id: Optional[str] = None, current_user: TokenData = Depends(get_current_user)):
+async def get_goals(
+    request: Request,
+    athlete_id: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get goals, optionally filtered by athlete."""
     query = {}
     if athlete_id:
         query["athlete_id"] = athlete_id
     
-    goals = await db_manager.find_documents(COLLECTIONS['goals'], query)
-    return [Goal(**goal) for goal in goals]
+    return await list_documents(request, COLLECTIONS['goals'], query, Goal, page)
 
 
 @api_router.post("/goals", response_model=Goal)
@@ -245,14 +510,18 @@ async def delete_goal(goal_id: str, current_user: TokenData = Depends(get_curren
 
 # PROGRAMS ENDPOINTS
 @api_router.get("/programs", response_model=List[Program])
-async def get_programs(athlete_id: Optional[str] = None, current_user: TokenData = Depends(get_current_user)):
+async def get_programs(
+    request: Request,
+    athlete_id: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get programs, optionally filtered by athlete."""
     query = {}
     if athlete_id:
         query["athlete_id"] = athlete_id
     
-    programs = await db_manager.find_documents(COLLECTIONS['programs'], query)
-    return [Program(**program) for program in programs]
+    return await list_documents(request, COLLECTIONS['programs'], query, Program, page)
 
 
 @api_router.post("/programs", response_model=Program)
@@ -292,10 +561,12 @@ async def delete_program(program_id: str, current_user: TokenData = Depends(get_
 # SESSIONS ENDPOINTS
 @api_router.get("/sessions", response_model=List[Session])
 async def get_sessions(
+    request: Request,
     athlete_id: Optional[str] = None,
     program_id: Optional[str] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
+    page: PageParams = Depends(page_params),
     current_user: TokenData = Depends(get_current_user)
 ):
     """Get sessions with optional filtering."""
@@ -307,8 +578,7 @@ async def get_sessions(
     if start_date and end_date:
         query["start"] = {"$gte": start_date, "$lte": end_date}
     
-    sessions = await db_manager.find_documents(COLLECTIONS['sessions'], query)
-    return [Session(**session) for session in sessions]
+    return await list_documents(request, COLLECTIONS['sessions'], query, Session, page)
 
 
 @api_router.post("/sessions", response_model=Session)
@@ -316,9 +586,41 @@ async def create_session(session_data: SessionCreate, current_user: TokenData =
     """Create a new session."""
     session = Session(**session_data.dict())
     created_session = await db_manager.create_document(COLLECTIONS['sessions'], session.dict())
+    await apply_session_changes([(None, created_session)])
     return Session(**created_session)
 
 
+@api_router.post("/sessions/bulk", response_model=BulkResult)
+async def bulk_sessions(bulk_data: SessionBulkRequest, current_user: TokenData = Depends(get_current_coach)):
+    """Create, update and change the status of many sessions in one request."""
+    updates = [("update", i, item.id, changed_fields(item)) for i, item in enumerate(bulk_data.update)]
+    updates += [("status", i, item.id, {"status": item.status.value}) for i, item in enumerate(bulk_data.status)]
+    
+    # Weekly rollups need the sessions as they were before the update
+    previous = {}
+    if updates:
+        ids = list({doc_id for _, _, doc_id, _ in updates})
+        sessions = await db_manager.find_documents(COLLECTIONS['sessions'], {"id": {"$in": ids}}, limit=None)
+        previous = {session['id']: session for session in sessions}
+    
+    documents = [Session(**item.dict()).dict() for item in bulk_data.create]
+    errors = await db_manager.bulk_write(
+        COLLECTIONS['sessions'],
+        documents,
+        [(doc_id, update_data) for _, _, doc_id, update_data in updates]
+    )
+    
+    changes = [(None, document) for document, error in zip(documents, errors) if error is None]
+    current = dict(previous)
+    for (_, _, doc_id, update_data), error in zip(updates, errors[len(documents):]):
+        if error is None and doc_id in current:
+            current[doc_id] = {**current[doc_id], **update_data}
+    changes += [(previous[doc_id], current[doc_id]) for doc_id in previous]
+    await apply_session_changes(changes)
+    
+    return bulk_result(documents, updates, errors)
+
+
 @api_router.put("/sessions/{session_id}", response_model=Session)
 async def update_session(
     session_id: str, 
@@ -327,34 +629,43 @@ async def update_session(
 ):
     """Update a session."""
     update_data = {k: v for k, v in session_data.dict().items() if v is not None}
-    updated_session = await db_manager.update_document(COLLECTIONS['sessions'], session_id, update_data)
+    previous_session, updated_session = await db_manager.update_document_with_previous(
+        COLLECTIONS['sessions'], session_id, update_data
+    )
     
     if not updated_session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    await apply_session_changes([(previous_session, updated_session)])
     return Session(**updated_session)
 
 
 @api_router.delete("/sessions/{session_id}")
 async def delete_session(session_id: str, current_user: TokenData = Depends(get_current_coach)):
     """Delete a session."""
-    success = await db_manager.delete_document(COLLECTIONS['sessions'], session_id)
-    if not success:
+    deleted_session = await db_manager.pop_document(COLLECTIONS['sessions'], session_id)
+    if not deleted_session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    await apply_session_changes([(deleted_session, None)])
+    
     return {"message": "Session deleted successfully"}
 
 
 # EXERCISES ENDPOINTS
 @api_router.get("/exercises", response_model=List[Exercise])
-async def get_exercises(category: Optional[ExerciseCategory] = None, current_user: TokenData = Depends(get_current_user)):
+async def get_exercises(
+    request: Request,
+    category: Optional[ExerciseCategory] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get all exercises, optionally filtered by category."""
     query = {}
     if category:
         query["category"] = category.value
     
-    exercises = await db_manager.find_documents(COLLECTIONS['exercises'], query)
-    return [Exercise(**exercise) for exercise in exercises]
+    return await list_documents(request, COLLECTIONS['exercises'], query, Exercise, page)
 
 
 @api_router.post("/exercises", response_model=Exercise)
@@ -393,14 +704,18 @@ async def delete_exercise(exercise_id: str, current_user: TokenData = Depends(ge
 
 # PHYSICAL ASSESSMENTS ENDPOINTS
 @api_router.get("/assessments", response_model=List[PhysicalAssessment])
-async def get_assessments(athlete_id: Optional[str] = None, current_user: TokenData = Depends(get_current_user)):
+async def get_assessments(
+    request: Request,
+    athlete_id: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get physical assessments, optionally filtered by athlete."""
     query = {}
     if athlete_id:
         query["athlete_id"] = athlete_id
     
-    assessments = await db_manager.find_documents(COLLECTIONS['physical_assessments'], query)
-    return [PhysicalAssessment(**assessment) for assessment in assessments]
+    return await list_documents(request, COLLECTIONS['physical_assessments'], query, PhysicalAssessment, page)
 
 
 @api_router.post("/assessments", response_model=PhysicalAssessment)
@@ -411,6 +726,13 @@ async def create_assessment(assessment_data: PhysicalAssessmentCreate, current_u
     return PhysicalAssessment(**created_assessment)
 
 
+@api_router.post("/assessments/bulk", response_model=BulkResult)
+async def bulk_assessments(bulk_data: PhysicalAssessmentBulkRequest, current_user: TokenData = Depends(get_current_coach)):
+    """Create and update many physical assessments in one request."""
+    updates = [("update", i, item.id, changed_fields(item)) for i, item in enumerate(bulk_data.update)]
+    return await run_bulk(COLLECTIONS['physical_assessments'], PhysicalAssessment, bulk_data.create, updates)
+
+
 @api_router.put("/assessments/{assessment_id}", response_model=PhysicalAssessment)
 async def update_assessment(
     assessment_id: str,
@@ -439,14 +761,18 @@ async def delete_assessment(assessment_id: str, current_user: TokenData = Depend
 
 # PERSONAL RECORDS ENDPOINTS
 @api_router.get("/records", response_model=List[PersonalRecord])
-async def get_records(athlete_id: Optional[str] = None, current_user: TokenData = Depends(get_current_user)):
+async def get_records(
+    request: Request,
+    athlete_id: Optional[str] = None,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get personal records, optionally filtered by athlete."""
     query = {}
     if athlete_id:
         query["athlete_id"] = athlete_id
     
-    records = await db_manager.find_documents(COLLECTIONS['personal_records'], query)
-    return [PersonalRecord(**record) for record in records]
+    return await list_documents(request, COLLECTIONS['personal_records'], query, PersonalRecord, page)
 
 
 @api_router.post("/records", response_model=PersonalRecord)
@@ -457,6 +783,13 @@ async def create_record(record_data: PersonalRecordCreate, current_user: TokenDa
     return PersonalRecord(**created_record)
 
 
+@api_router.post("/records/bulk", response_model=BulkResult)
+async def bulk_records(bulk_data: PersonalRecordBulkRequest, current_user: TokenData = Depends(get_current_coach)):
+    """Create and update many personal records in one request."""
+    updates = [("update", i, item.id, changed_fields(item)) for i, item in enumerate(bulk_data.update)]
+    return await run_bulk(COLLECTIONS['personal_records'], PersonalRecord, bulk_data.create, updates)
+
+
 @api_router.delete("/records/{record_id}")
 async def delete_record(record_id: str, current_user: TokenData = Depends(get_current_coach)):
     """Delete a personal record."""
@@ -469,10 +802,13 @@ async def delete_record(record_id: str, current_user: TokenData = Depends(get_cu
 
 # SESSION TEMPLATES ENDPOINTS
 @api_router.get("/templates/sessions", response_model=List[SessionTemplate])
-async def get_session_templates(current_user: TokenData = Depends(get_current_user)):
+async def get_session_templates(
+    request: Request,
+    page: PageParams = Depends(page_params),
+    current_user: TokenData = Depends(get_current_user)
+):
     """Get all session templates."""
-    templates = await db_manager.get_documents(COLLECTIONS['session_templates'])
-    return [SessionTemplate(**template) for template in templates]
+    return await list_documents(request, COLLECTIONS['session_templates'], {}, SessionTemplate, page)
 
 
 @api_router.post("/templates/sessions", response_model=SessionTemplate)
@@ -494,67 +830,220 @@ async def delete_session_template(template_id: str, current_user: TokenData = De
 
 
 # ANALYTICS ENDPOINTS
+def check_overview_window(window_days: int):
+    if window_days not in OVERVIEW_WINDOWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"window_days must be one of {', '.join(map(str, OVERVIEW_WINDOWS))}"
+        )
+
+
 @api_router.get("/analytics/athlete/{athlete_id}/overview", response_model=AthleteOverview)
-async def get_athlete_overview(athlete_id: str, current_user: TokenData = Depends(get_current_user)):
-    """Get athlete overview analytics."""
-    # Get sessions for the last 7 days
-    week_ago = datetime.now() - timedelta(days=7)
-    recent_sessions = await db_manager.find_documents(
+async def get_athlete_overview(
+    athlete_id: str,
+    window_days: int = 7,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get athlete overview analytics over the last 7, 28 or 90 days."""
+    check_overview_window(window_days)
+    
+    # Count and average done sessions inside MongoDB, one row per session type
+    since = datetime.now() - timedelta(days=window_days)
+    rows = await db_manager.aggregate(
         COLLECTIONS['sessions'],
-        {
-            "athlete_id": athlete_id,
-            "start": {"$gte": week_ago},
-            "status": SessionStatus.DONE.value
-        }
+        overview_pipeline({"athlete_id": athlete_id}, since)
     )
     
-    # Calculate metrics
-    weekly_volume = len(recent_sessions)
-    intensity_avg = sum(session.get('intensity', 0) for session in recent_sessions) / len(recent_sessions) if recent_sessions else 0
-    
-    # Count sessions by type
-    sessions_count_by_type = {}
-    for session in recent_sessions:
-        session_type = session.get('type', 'other')
-        sessions_count_by_type[session_type] = sessions_count_by_type.get(session_type, 0) + 1
-    
     # Get upcoming events (placeholder - would need Event model integration)
     next_events = []
     
     return AthleteOverview(
-        weekly_volume=weekly_volume,
-        intensity_avg=round(intensity_avg, 1),
-        sessions_count_by_type=sessions_count_by_type,
-        next_events=next_events
+        window_days=window_days,
+        next_events=next_events,
+        **summarize_overview(rows)
+    )
+
+
+@api_router.get("/analytics/roster/overview", response_model=List[RosterOverviewEntry])
+async def get_roster_overview(
+    response: Response,
+    sector: Optional[str] = None,
+    window_days: int = 7,
+    page: PageParams = Depends(cursor_page_params),
+    current_user: TokenData = Depends(get_current_coach)
+):
+    """Get overview analytics for a page of athletes with a single aggregation."""
+    check_overview_window(window_days)
+    
+    query = {"sector": sector} if sector else {}
+    athletes, headers = await fetch_page(
+        COLLECTIONS['athletes'], query, page, ["id", "first_name", "last_name", "sector"]
     )
+    response.headers.update(headers)
+    athlete_ids = [athlete['id'] for athlete in athletes]
+    
+    since = datetime.now() - timedelta(days=window_days)
+    rows = await db_manager.aggregate(
+        COLLECTIONS['sessions'],
+        overview_pipeline({"athlete_id": {"$in": athlete_ids}}, since),
+        limit=None
+    )
+    overviews = summarize_roster_overview(rows, athlete_ids)
+    
+    return [
+        RosterOverviewEntry(
+            athlete_id=athlete['id'],
+            first_name=athlete['first_name'],
+            last_name=athlete['last_name'],
+            sector=athlete.get('sector'),
+            overview=AthleteOverview(window_days=window_days, next_events=[], **overviews[athlete['id']])
+        )
+        for athlete in athletes
+    ]
 
 
 @api_router.get("/analytics/athlete/{athlete_id}/assessments", response_model=AssessmentSeries)
-async def get_athlete_assessments(athlete_id: str, current_user: TokenData = Depends(get_current_user)):
-    """Get athlete assessment series for charts."""
+async def get_athlete_assessments(
+    athlete_id: str,
+    stats: Optional[str] = Query(None, description="Comma-separated: rolling_mean, delta, slope"),
+    window: int = Query(3, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get athlete assessment series for charts, optionally with per-metric trends."""
+    requested_stats = [stat.strip() for stat in stats.split(",") if stat.strip()] if stats else []
+    unknown = [stat for stat in requested_stats if stat not in ASSESSMENT_STATS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown stats: {', '.join(unknown)}"
+        )
+    
+    # Sorted and projected by MongoDB on the (athlete_id, date) index
     assessments = await db_manager.find_documents(
         COLLECTIONS['physical_assessments'],
-        {"athlete_id": athlete_id}
+        {"athlete_id": athlete_id},
+        limit=None,
+        fields=["date", *ASSESSMENT_METRICS],
+        sort=[("date", 1), ("id", 1)]
     )
     
-    # Sort by date
-    assessments.sort(key=lambda x: x['date'])
+    dates, matrix = assessment_matrix(assessments)
+    series = {
+        metric: to_optional_list(matrix[:, i], int)
+        for i, metric in enumerate(ASSESSMENT_METRICS)
+    }
     
-    dates = [assessment['date'].strftime('%Y-%m-%d') for assessment in assessments]
+    metric_stats = None
+    if requested_stats:
+        means = rolling_mean(matrix, window) if "rolling_mean" in requested_stats else None
+        changes = deltas(matrix) if "delta" in requested_stats else None
+        trends = slopes(dates, matrix) if "slope" in requested_stats else None
+        metric_stats = {
+            metric: MetricStats(
+                rolling_mean=to_optional_list(means[:, i]) if means is not None else None,
+                delta=to_optional_list(changes[:, i]) if changes is not None else None,
+                slope_per_30d=to_optional_list(trends[i:i + 1])[0] if trends is not None else None
+            )
+            for i, metric in enumerate(ASSESSMENT_METRICS)
+        }
     
     return AssessmentSeries(
-        dates=dates,
-        strength_max=[assessment.get('strength_max') for assessment in assessments],
-        strength_endurance=[assessment.get('strength_endurance') for assessment in assessments],
-        strength_explosive=[assessment.get('strength_explosive') for assessment in assessments],
-        speed_linear=[assessment.get('speed_linear') for assessment in assessments],
-        agility=[assessment.get('agility') for assessment in assessments],
-        power=[assessment.get('power') for assessment in assessments],
-        mobility=[assessment.get('mobility') for assessment in assessments],
-        endurance_aerobic=[assessment.get('endurance_aerobic') for assessment in assessments],
-        endurance_lactate=[assessment.get('endurance_lactate') for assessment in assessments],
-        icm=[assessment.get('icm') for assessment in assessments]
+        dates=[date.strftime('%Y-%m-%d') for date in dates],
+        stats=metric_stats,
+        **series
+    )
+
+
+@api_router.get("/analytics/athlete/{athlete_id}/weekly", response_model=List[WeeklyRollup])
+async def get_athlete_weekly(
+    athlete_id: str,
+    weeks: int = Query(12, ge=1, le=520),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get the athlete's weekly training rollups, oldest week first."""
+    since = datetime.now() - timedelta(weeks=weeks)
+    rollups = await db_manager.find_documents(
+        COLLECTIONS['weekly_rollups'],
+        {"athlete_id": athlete_id, "week_start": {"$gte": since - timedelta(days=7)}},
+        limit=None,
+        sort=[("iso_week", 1)]
+    )
+    
+    for rollup in rollups:
+        count = rollup.get('intensity_count', 0)
+        rollup['intensity_avg'] = round(rollup.get('intensity_sum', 0) / count, 1) if count else 0
+        # Types whose sessions were all moved out of the week are left at zero by $inc
+        rollup['count_by_type'] = {k: v for k, v in rollup.get('count_by_type', {}).items() if v}
+    
+    return [WeeklyRollup(**rollup) for rollup in rollups[-weeks:]]
+
+
+async def compute_load(athlete_ids: List[str], days: int, match: dict) -> Tuple[datetime, Dict[str, Any]]:
+    """Daily load metrics for the given athletes over the last `days` days plus the chronic warm-up."""
+    first_day, total_days = load_window(days)
+    rows = await db_manager.aggregate(
+        COLLECTIONS['sessions'],
+        daily_load_pipeline(match, first_day),
+        limit=None
     )
+    return first_day, load_metrics(load_matrix(rows, athlete_ids, first_day, total_days))
+
+
+@api_router.get("/analytics/athlete/{athlete_id}/load", response_model=AthleteLoad)
+async def get_athlete_load(
+    athlete_id: str,
+    days: int = Query(28, ge=1, le=730),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Get daily session-RPE load, ACWR, monotony and strain for an athlete."""
+    first_day, metrics = await compute_load([athlete_id], days, {"athlete_id": athlete_id})
+    series = load_series(metrics, 0, first_day, days)
+    latest = load_summaries([athlete_id], metrics, first_day)[0]
+    return AthleteLoad(athlete_id=athlete_id, latest=LoadSummary(**latest), **series)
+
+
+@api_router.get("/analytics/load", response_model=List[LoadSummary])
+async def get_roster_load(
+    sector: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_coach)
+):
+    """Get today's load metrics for every athlete, optionally filtered by sector."""
+    query = {"sector": sector} if sector else {}
+    athletes = await db_manager.find_documents(COLLECTIONS['athletes'], query, limit=None, fields=["id"])
+    athlete_ids = [athlete['id'] for athlete in athletes]
+    
+    # The chronic window is the longest lookback needed for today's values
+    match = {"athlete_id": {"$in": athlete_ids}} if sector else {}
+    first_day, metrics = await compute_load(athlete_ids, 1, match)
+    return [LoadSummary(**summary) for summary in load_summaries(athlete_ids, metrics, first_day)]
+
+
+# ADMIN ENDPOINTS
+@api_router.get("/admin/cache")
+async def get_cache_stats(current_user: TokenData = Depends(get_current_coach)):
+    """Get document cache hit/miss/eviction counters per collection."""
+    return db_manager.cache_stats()
+
+
+@api_router.get("/admin/password-hashing")
+async def get_password_hashing_stats(current_user: TokenData = Depends(get_current_coach)):
+    """Get queue depth and throughput counters of the password hashing pool."""
+    return password_hasher.stats()
+
+
+@api_router.get("/admin/token-cache")
+async def get_token_cache_stats(current_user: TokenData = Depends(get_current_coach)):
+    """Get hit/miss/eviction counters of the verified-token cache."""
+    return token_cache.stats()
+
+
+@api_router.get("/admin/slow-queries")
+async def get_slow_queries(
+    limit: int = Query(20, ge=1, le=500),
+    current_user: TokenData = Depends(get_current_coach)
+):
+    """Get the slow query shapes that took the most total time, with their winning plans."""
+    return db_manager.slow_queries.top(limit)
 
 
 # Root endpoint for health check
@@ -567,7 +1056,59 @@ async def root():
 app.include_router(api_router)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.on_event("startup")
+async def calibrate_password_hashing():
+    """Apply the configured bcrypt cost and report how it fits this machine."""
+    rounds, suggested = await password_hasher.run(setup_password_hashing)
+    logger.info(f"Using bcrypt cost {rounds}")
+    if suggested != rounds:
+        logger.warning(f"bcrypt cost {suggested} would take about {BCRYPT_TARGET_MS:.0f} ms here; set BCRYPT_ROUNDS to change it")
+
+
+@app.on_event("startup")
+async def create_indexes():
+    """Make sure the declared indexes exist before serving traffic."""
+    try:
+        created = await db_manager.ensure_indexes()
+        logger.info(f"Ensured indexes on {len(created)} collections")
+    except Exception as e:
+        logger.error(f"Index bootstrap failed: {e}")
+    
+    try:
+        backfilled = await backfill_search_tokens()
+        if backfilled:
+            logger.info(f"Added search tokens to {backfilled} athletes")
+    except Exception as e:
+        logger.error(f"Search token backfill failed: {e}")
+
+
+@app.on_event("startup")
+async def load_revocations():
+    """Mirror revoked tokens into memory and keep the copy fresh."""
+    try:
+        await revocation_list.refresh()
+    except Exception as e:
+        logger.error(f"Revocation list load failed: {e}")
+    app.state.revocation_refresher = asyncio.create_task(revocation_list.run())
+
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    """Sample event loop lag for the metrics endpoint."""
+    app.state.event_loop_monitor = asyncio.create_task(monitor_event_loop())
+
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close database connections on shutdown."""
-    pass  # Motor handles connection cleanup automatically
+    for task_name in ("revocation_refresher", "event_loop_monitor"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    # Motor handles connection cleanup automatically
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Finds and aggregations slower than this are logged and grouped by query shape
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+# Explains run one at a time and at most this often across all shapes
+EXPLAIN_MIN_INTERVAL_SECONDS = float(os.getenv("EXPLAIN_MIN_INTERVAL_SECONDS", "10"))
+# A shape's winning plan is re-captured after this long, in case indexes changed
+EXPLAIN_REFRESH_SECONDS = float(os.getenv("EXPLAIN_REFRESH_SECONDS", "3600"))
+# Shapes kept in memory; the one with the least total time is dropped first
+MAX_SLOW_QUERY_SHAPES = int(os.getenv("MAX_SLOW_QUERY_SHAPES", "500"))
+
+
+def query_shape(value: Any) -> Any:
+    """Replace the literal values of a query or pipeline with "?", keeping fields and operators.
+    
+    Lists of literals such as $in operands collapse to a single "?", and "$field"
+    references in aggregation expressions are kept.
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = [query_shape(item) for item in value]
+        return "?" if all(shape == "?" for shape in shapes) else shapes
+    if isinstance(value, str) and value.startswith("$"):
+        return value
+    return "?"
+
+
+def winning_plan(explain: dict) -> Optional[dict]:
+    """Winning plan of a queryPlanner explain, for finds and for aggregations."""
+    planner = explain.get("queryPlanner")
+    if planner is None:
+        # Aggregations that are not fully pushed down report the plan of their $cursor stage
+        for stage in explain.get("stages", []):
+            if "$cursor" in stage:
+                planner = stage["$cursor"].get("queryPlanner")
+                break
+    if planner is None:
+        return None
+    plan = planner.get("winningPlan", {})
+    # The slot based engine nests the classic plan tree one level down
+    return plan.get("queryPlan", plan)
+
+
+def plan_summary(plan: dict) -> str:
+    """Plan tree as text, e.g. "LIMIT > FETCH > IXSCAN(athlete_id_1_start_1_id_1)"."""
+    stage = plan.get("stage", "UNKNOWN")
+    if "indexName" in plan:
+        stage += f"({plan['indexName']})"
+    children = [plan["inputStage"]] if "inputStage" in plan else plan.get("inputStages", [])
+    if not children:
+        return stage
+    if len(children) == 1:
+        return f"{stage} > {plan_summary(children[0])}"
+    return f"{stage} > [{', '.join(plan_summary(child) for child in children)}]"
+
+
+class SlowQueryLog:
+    """Logs slow finds and aggregations and aggregates them by query shape.
+    
+    The winning plan of each shape is captured with a queryPlanner explain in a
+    background task, rate limited so a burst of slow queries does not turn into
+    a burst of explains against an already struggling database.
+    """
+    def __init__(
+        self,
+        threshold_ms: float = SLOW_QUERY_THRESHOLD_MS,
+        explain_interval: float = EXPLAIN_MIN_INTERVAL_SECONDS,
+        explain_refresh: float = EXPLAIN_REFRESH_SECONDS,
+        max_shapes: int = MAX_SLOW_QUERY_SHAPES
+    ):
+        self.threshold = threshold_ms / 1000
+        self.explain_interval = explain_interval
+        self.explain_refresh = explain_refresh
+        self.max_shapes = max_shapes
+        self.shapes: Dict[str, dict] = {}
+        self._explained: Dict[str, float] = {}
+        self._last_explain = float("-inf")
+        self._explaining: Optional[asyncio.Task] = None
+    
+    def observe_find(
+        self,
+        backend,
+        operation: str,
+        collection: str,
+        query: dict,
+        sort: Optional[List],
+        limit: Optional[int],
+        duration: float,
+        returned: int
+    ):
+        if duration < self.threshold:
+            return
+        shape = {"filter": query_shape(query), "sort": [list(key) for key in sort or []]}
+        self._record(
+            operation, collection, shape, duration, returned,
+            lambda: backend.explain_find(collection, query, sort, limit)
+        )
+    
+    def observe_aggregate(self, backend, collection: str, pipeline: List[dict], duration: float, returned: int):
+        if duration < self.threshold:
+            return
+        self._record(
+            "aggregate", collection, {"pipeline": query_shape(pipeline)}, duration, returned,
+            lambda: backend.explain_aggregate(collection, pipeline)
+        )
+    
+    def _record(
+        self,
+        operation: str,
+        collection: str,
+        shape: dict,
+        duration: float,
+        returned: int,
+        explain: Callable[[], Awaitable[dict]]
+    ):
+        key = f"{collection} {operation} {json.dumps(shape, sort_keys=True)}"
+        logger.warning(json.dumps({
+            "collection": collection,
+            "operation": operation,
+            "shape": shape,
+            "duration_ms": round(duration * 1000, 2),
+            "docs_returned": returned
+        }))
+        
+        entry = self.shapes.get(key)
+        if entry is None:
+            if len(self.shapes) >= self.max_shapes:
+                self._evict()
+            entry = self.shapes[key] = {
+                "collection": collection,
+                "operation": operation,
+                "shape": shape,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "docs_returned": 0,
+                "last_seen": None,
+                "plan": None,
+                "collection_scan": None,
+                "explained_at": None
+            }
+        entry["count"] += 1
+        entry["total_ms"] += duration * 1000
+        entry["max_ms"] = max(entry["max_ms"], duration * 1000)
+        entry["docs_returned"] += returned
+        entry["last_seen"] = datetime.utcnow()
+        
+        self._schedule_explain(key, explain)
+    
+    def _evict(self):
+        key = min(self.shapes, key=lambda shape: self.shapes[shape]["total_ms"])
+        del self.shapes[key]
+        self._explained.pop(key, None)
+    
+    def _schedule_explain(self, key: str, explain: Callable[[], Awaitable[dict]]):
+        now = time.monotonic()
+        if self._explaining is not None and not self._explaining.done():
+            return
+        if now - self._last_explain < self.explain_interval:
+            return
+        if now - self._explained.get(key, float("-inf")) < self.explain_refresh:
+            return
+        
+        self._last_explain = now
+        self._explained[key] = now
+        self._explaining = asyncio.create_task(self._explain(key, explain))
+    
+    async def _explain(self, key: str, explain: Callable[[], Awaitable[dict]]):
+        try:
+            plan = winning_plan(await explain())
+        except Exception as e:
+            logger.warning(f"Explain of slow query shape failed: {e}")
+            return
+        
+        summary = plan_summary(plan) if plan else "UNKNOWN"
+        entry = self.shapes.get(key)
+        if entry is not None:
+            entry["plan"] = summary
+            entry["collection_scan"] = "COLLSCAN" in summary
+            entry["explained_at"] = datetime.utcnow()
+            logger.warning(json.dumps({
+                "collection": entry["collection"],
+                "operation": entry["operation"],
+                "shape": entry["shape"],
+                "plan": summary
+            }))
+    
+    def top(self, limit: int = 20) -> List[dict]:
+        """Slow query shapes by total time spent, with average latency and winning plan."""
+        ranked = sorted(self.shapes.values(), key=lambda entry: entry["total_ms"], reverse=True)[:limit]
+        return [
+            {
+                **entry,
+                "total_ms": round(entry["total_ms"], 2),
+                "max_ms": round(entry["max_ms"], 2),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 2),
+                "avg_docs_returned": round(entry["docs_returned"] / entry["count"], 1)
+            }
+            for entry in ranked
+        ]
+    
+    def clear(self):
+        self.shapes.clear()
+        self._explained.clear()
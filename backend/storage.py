@@ -0,0 +1,295 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import IndexModel, ReturnDocument, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+import os
+from typing import Optional, List, Tuple, AsyncIterator, Protocol
+
+# Sort specification: (field, 1 for ascending / -1 for descending) pairs
+Sort = List[Tuple[str, int]]
+# Upsert with counters: (filter, $inc, $set, $setOnInsert)
+Increment = Tuple[dict, dict, dict, dict]
+
+
+def projection(fields: Optional[List[str]]) -> dict:
+    """Build a MongoDB projection that returns only the given fields, never the ObjectId."""
+    if not fields:
+        return {"_id": 0}
+    return {"_id": 0, **{field: 1 for field in fields}}
+
+
+class StorageBackend(Protocol):
+    """Storage primitives DatabaseManager is built on.
+    
+    Documents are addressed by their "id" field and never carry MongoDB's _id.
+    Queries use the MongoDB query language, limited to the operators this app
+    uses; timestamps, caching and pagination cursors stay in DatabaseManager.
+    """
+    async def insert_one(self, collection: str, document: dict):
+        """Insert a document; raises pymongo's DuplicateKeyError on a unique index clash."""
+    
+    async def insert_many(self, collection: str, documents: List[dict]) -> List[Optional[str]]:
+        """Insert documents unordered; one error message per document, None on success."""
+    
+    async def bulk_write(self, collection: str, creates: List[dict], updates: List[Tuple[str, dict]]) -> List[Optional[str]]:
+        """Inserts and $set updates by id; one error per operation, creates first."""
+    
+    async def find_one(self, collection: str, query: dict, fields: Optional[List[str]] = None) -> Optional[dict]:
+        ...
+    
+    async def find(
+        self,
+        collection: str,
+        query: dict,
+        fields: Optional[List[str]] = None,
+        sort: Optional[Sort] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        ...
+    
+    def iterate(
+        self,
+        collection: str,
+        query: dict,
+        fields: Optional[List[str]],
+        sort: Sort,
+        limit: Optional[int],
+        batch_size: int
+    ) -> AsyncIterator[dict]:
+        """Stream matching documents without materializing them all."""
+    
+    async def update_one(
+        self,
+        collection: str,
+        doc_id: str,
+        update_data: dict,
+        fields: Optional[List[str]] = None,
+        return_previous: bool = False
+    ) -> Optional[dict]:
+        """$set fields on a document by id; returns it after the update, or before when asked."""
+    
+    async def upsert_increments(self, collection: str, increments: List[Increment]):
+        ...
+    
+    async def delete_one(self, collection: str, doc_id: str) -> bool:
+        ...
+    
+    async def pop_one(self, collection: str, doc_id: str) -> Optional[dict]:
+        """Delete a document by id and return it."""
+    
+    async def delete_many(self, collection: str, query: dict) -> int:
+        ...
+    
+    async def count(self, collection: str, query: dict) -> int:
+        ...
+    
+    async def estimate_count(self, collection: str, query: Optional[dict]) -> int:
+        ...
+    
+    async def aggregate(self, collection: str, pipeline: List[dict], limit: Optional[int]) -> List[dict]:
+        ...
+    
+    async def create_indexes(self, collection: str, specs: List[dict]) -> List[str]:
+        """Create the given INDEXES entries; returns their names."""
+    
+    async def index_names(self, collection: str) -> List[str]:
+        ...
+    
+    async def explain_find(self, collection: str, query: dict, sort: Optional[Sort], limit: Optional[int]) -> dict:
+        """Query plan of a find, in the shape of MongoDB's queryPlanner explain output."""
+    
+    async def explain_aggregate(self, collection: str, pipeline: List[dict]) -> dict:
+        """Query plan of an aggregation, in the shape of MongoDB's queryPlanner explain output."""
+
+
+class MotorBackend:
+    """MongoDB through Motor. The client is only created on first use, so
+    pymongo event listeners can be added until then."""
+    def __init__(self, mongo_url: str, db_name: str, database=None):
+        self.mongo_url = mongo_url
+        self.db_name = db_name
+        self.event_listeners = []
+        self._db = database
+    
+    @property
+    def db(self):
+        if self._db is None:
+            client = AsyncIOMotorClient(self.mongo_url, event_listeners=self.event_listeners)
+            self._db = client[self.db_name]
+        return self._db
+    
+    async def insert_one(self, collection: str, document: dict):
+        await self.db[collection].insert_one(document)
+        document.pop('_id', None)
+    
+    async def insert_many(self, collection: str, documents: List[dict]) -> List[Optional[str]]:
+        errors = [None] * len(documents)
+        if not documents:
+            return errors
+        
+        try:
+            await self.db[collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                errors[error['index']] = error.get('errmsg', 'Write failed')
+        
+        for document in documents:
+            document.pop('_id', None)
+        
+        return errors
+    
+    async def bulk_write(self, collection: str, creates: List[dict], updates: List[Tuple[str, dict]]) -> List[Optional[str]]:
+        operations = [InsertOne(document) for document in creates]
+        operations += [UpdateOne({"id": doc_id}, {"$set": update_data}) for doc_id, update_data in updates]
+        
+        errors = [None] * len(operations)
+        if not operations:
+            return errors
+        
+        try:
+            result = await self.db[collection].bulk_write(operations, ordered=False)
+            matched = result.matched_count
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                errors[error['index']] = error.get('errmsg', 'Write failed')
+            matched = e.details.get('nMatched', 0)
+        
+        for document in creates:
+            document.pop('_id', None)
+        
+        # Bulk results only carry aggregate counts, so unknown IDs are
+        # looked up only when some update matched nothing
+        offset = len(creates)
+        pending = [i for i in range(offset, len(operations)) if errors[i] is None]
+        if matched < len(pending):
+            update_ids = [doc_id for doc_id, _ in updates]
+            found = set(await self.db[collection].distinct("id", {"id": {"$in": update_ids}}))
+            for i in pending:
+                if updates[i - offset][0] not in found:
+                    errors[i] = "Document not found"
+        
+        return errors
+    
+    async def find_one(self, collection: str, query: dict, fields: Optional[List[str]] = None) -> Optional[dict]:
+        return await self.db[collection].find_one(query, projection(fields))
+    
+    async def find(
+        self,
+        collection: str,
+        query: dict,
+        fields: Optional[List[str]] = None,
+        sort: Optional[Sort] = None,
+        limit: Optional[int] = None
+    ) -> List[dict]:
+        cursor = self.db[collection].find(query, projection(fields))
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return await cursor.to_list(length=limit)
+    
+    def iterate(
+        self,
+        collection: str,
+        query: dict,
+        fields: Optional[List[str]],
+        sort: Sort,
+        limit: Optional[int],
+        batch_size: int
+    ) -> AsyncIterator[dict]:
+        cursor = self.db[collection].find(query, projection(fields)).sort(sort).batch_size(batch_size)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+    
+    async def update_one(
+        self,
+        collection: str,
+        doc_id: str,
+        update_data: dict,
+        fields: Optional[List[str]] = None,
+        return_previous: bool = False
+    ) -> Optional[dict]:
+        return await self.db[collection].find_one_and_update(
+            {"id": doc_id},
+            {"$set": update_data},
+            projection=projection(fields),
+            return_document=ReturnDocument.BEFORE if return_previous else ReturnDocument.AFTER
+        )
+    
+    async def upsert_increments(self, collection: str, increments: List[Increment]):
+        operations = [
+            UpdateOne(query, {"$inc": inc, "$set": fields, "$setOnInsert": defaults}, upsert=True)
+            for query, inc, fields, defaults in increments
+        ]
+        await self.db[collection].bulk_write(operations, ordered=False)
+    
+    async def delete_one(self, collection: str, doc_id: str) -> bool:
+        result = await self.db[collection].delete_one({"id": doc_id})
+        return result.deleted_count > 0
+    
+    async def pop_one(self, collection: str, doc_id: str) -> Optional[dict]:
+        return await self.db[collection].find_one_and_delete({"id": doc_id}, projection=projection(None))
+    
+    async def delete_many(self, collection: str, query: dict) -> int:
+        result = await self.db[collection].delete_many(query)
+        return result.deleted_count
+    
+    async def count(self, collection: str, query: dict) -> int:
+        return await self.db[collection].count_documents(query)
+    
+    async def estimate_count(self, collection: str, query: Optional[dict]) -> int:
+        if not query:
+            return await self.db[collection].estimated_document_count()
+        return await self.db[collection].count_documents(query)
+    
+    async def aggregate(self, collection: str, pipeline: List[dict], limit: Optional[int]) -> List[dict]:
+        documents = await self.db[collection].aggregate(pipeline).to_list(length=limit)
+        for document in documents:
+            document.pop('_id', None)
+        return documents
+    
+    async def create_indexes(self, collection: str, specs: List[dict]) -> List[str]:
+        models = [IndexModel(spec['keys'], name=index_name(spec), **spec.get('options', {})) for spec in specs]
+        return await self.db[collection].create_indexes(models)
+    
+    async def index_names(self, collection: str) -> List[str]:
+        return [index['name'] async for index in self.db[collection].list_indexes()]
+    
+    async def explain_find(self, collection: str, query: dict, sort: Optional[Sort], limit: Optional[int]) -> dict:
+        command = {"find": collection, "filter": query}
+        if sort:
+            command["sort"] = dict(sort)
+        if limit:
+            command["limit"] = limit
+        # queryPlanner only plans the query, it does not run it again
+        return await self.db.command("explain", command, verbosity="queryPlanner")
+    
+    async def explain_aggregate(self, collection: str, pipeline: List[dict]) -> dict:
+        command = {"aggregate": collection, "pipeline": pipeline, "cursor": {}}
+        return await self.db.command("explain", command, verbosity="queryPlanner")
+
+
+def index_name(spec: dict) -> str:
+    """Derive the index name MongoDB would generate for the given keys."""
+    return "_".join(f"{field}_{direction}" for field, direction in spec['keys'])
+
+
+def create_backend(
+    kind: Optional[str] = None,
+    mongo_url: Optional[str] = None,
+    db_name: Optional[str] = None
+) -> StorageBackend:
+    """Build the backend named by STORAGE_BACKEND: "mongo" (default) or "memory".
+    
+    The MongoDB URL and database name default to MONGO_URL and DB_NAME.
+    """
+    kind = (kind or os.environ.get('STORAGE_BACKEND', 'mongo')).lower()
+    if kind == 'memory':
+        from memory_storage import MemoryBackend
+        return MemoryBackend()
+    if kind == 'mongo':
+        return MotorBackend(
+            mongo_url or os.environ.get('MONGO_URL', 'mongodb://localhost:27017'),
+            db_name or os.environ.get('DB_NAME', 'athletica')
+        )
+    raise ValueError(f"Unknown STORAGE_BACKEND: {kind}")
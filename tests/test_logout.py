@@ -0,0 +1,27 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import jwt
+from fastapi.testclient import TestClient
+
+from auth import ACCESS_TOKEN_EXPIRE_MINUTES, ALGORITHM, SECRET_KEY
+from database import db_manager, COLLECTIONS
+from memory_storage import MemoryBackend
+from revocation import revocation_list
+from server import app
+
+
+def test_logout_revokes_token_without_expiry(monkeypatch):
+    monkeypatch.setattr(db_manager, "backend", MemoryBackend())
+    jti = str(uuid.uuid4())
+    token = jwt.encode({"sub": "user-1", "role": "coach", "jti": jti}, SECRET_KEY, algorithm=ALGORITHM)
+    
+    # Not entered as a context manager, so startup handlers do not run
+    response = TestClient(app).post("/api/auth/logout", headers={"Authorization": f"Bearer {token}"})
+    
+    assert response.status_code == 200
+    assert revocation_list.is_revoked(jti)
+    revoked = asyncio.run(db_manager.find_one(COLLECTIONS['revoked_tokens'], {"id": jti}))
+    expected = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    assert abs(revoked["expires_at"] - expected) < timedelta(minutes=1)
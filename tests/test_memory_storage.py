@@ -0,0 +1,25 @@
+import asyncio
+import uuid
+
+from database import DatabaseManager, COLLECTIONS
+from memory_storage import MemoryBackend
+
+
+def test_keyset_pages_do_not_repeat_documents():
+    async def page_through():
+        manager = DatabaseManager(MemoryBackend())
+        for i in range(7):
+            await manager.create_document(COLLECTIONS['goals'], {"id": str(uuid.uuid4()), "title": f"Goal {i}"})
+        
+        ids, cursor = [], None
+        # Bounded, so a cursor that keeps repeating rows fails instead of looping
+        for _ in range(10):
+            documents, cursor = await manager.find_page(COLLECTIONS['goals'], {}, 3, cursor)
+            ids += [document['id'] for document in documents]
+            if cursor is None:
+                break
+        return ids
+    
+    ids = asyncio.run(page_through())
+    assert len(ids) == 7
+    assert len(set(ids)) == 7
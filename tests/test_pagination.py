@@ -0,0 +1,16 @@
+from datetime import datetime
+
+import pytest
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    values = [datetime(2024, 5, 1, 12, 30, 0, 123000), "id-1"]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+
+@pytest.mark.parametrize("values", [["id-1"], ["a", "b", "c"], [{"$ne": None}, "id-1"], [[1], "id-1"]])
+def test_malformed_cursor_is_rejected(values):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(encode_cursor(values), 2)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from profiling import ProfiledRoute, ProfilingMiddleware
+
+
+class Item(BaseModel):
+    name: str
+    quantity: int
+
+
+def test_validation_and_serialization_are_separate_phases():
+    router = APIRouter(route_class=ProfiledRoute)
+    
+    @router.post("/items", response_model=Item)
+    async def create_item(item: Item):
+        return item
+    
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ProfilingMiddleware, sample_rate=1.0)
+    
+    response = TestClient(app).post("/items", json={"name": "bar", "quantity": 3})
+    phases = {entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")}
+    assert {"app", "validation", "serialization", "framework"} <= phases
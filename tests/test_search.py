@@ -0,0 +1,40 @@
+import asyncio
+import uuid
+
+import pytest
+
+from database import DatabaseManager, COLLECTIONS
+from memory_storage import MemoryBackend
+from search import name_tokens, search_query
+
+
+@pytest.mark.parametrize("first_name, last_name, tokens", [
+    ("Ørjan", "Østby", ["ørjan", "østby"]),
+    ("Łukasz", "Żurek", ["łukasz", "zurek"]),
+    ("Иван", "Петров", ["иван", "петров"]),
+    ("José-María", "Núñez", ["jose", "maria", "nunez"]),
+])
+def test_name_tokens_keep_non_ascii_letters(first_name, last_name, tokens):
+    assert name_tokens(first_name, last_name) == tokens
+
+
+def test_search_query_without_tokens_is_none():
+    assert search_query("!!! _") is None
+
+
+def test_non_ascii_prefixes_find_athletes():
+    async def search(text):
+        manager = DatabaseManager(MemoryBackend())
+        for first_name, last_name in [("Ørjan", "Østby"), ("Łukasz", "Nowak"), ("Иван", "Петров")]:
+            await manager.create_document(COLLECTIONS['athletes'], {
+                "id": str(uuid.uuid4()),
+                "first_name": first_name,
+                "last_name": last_name,
+                "search_tokens": name_tokens(first_name, last_name)
+            })
+        athletes = await manager.find_documents(COLLECTIONS['athletes'], search_query(text))
+        return [athlete['first_name'] for athlete in athletes]
+    
+    assert asyncio.run(search("ør")) == ["Ørjan"]
+    assert asyncio.run(search("ŁUK")) == ["Łukasz"]
+    assert asyncio.run(search("пет")) == ["Иван"]